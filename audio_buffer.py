@@ -0,0 +1,15 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def to_pcm16(samples):
+    """Convert float32 samples to little-endian 16-bit PCM bytes"""
+    pcm = np.clip(samples * 32768.0, -32768, 32767).astype("<i2")
+    return pcm.tobytes()
+
+
+def to_audio_data(samples, sample_rate=SAMPLE_RATE):
+    """Wrap float32 samples as speech_recognition AudioData without touching disk"""
+    import speech_recognition as sr
+    return sr.AudioData(to_pcm16(samples), sample_rate, 2)
@@ -0,0 +1,275 @@
+import json
+import time
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+
+from audio_buffer import SAMPLE_RATE
+from dsp import FilterChain, language_preset, normalize
+from vad import NoiseFloorTracker, vad_segments
+
+BLOCK_SECONDS = 5
+
+# ffmpeg probes up to 5 MB of input before decoding; on a network stream
+# that is minutes of audio, so pipes are probed with a small window instead
+PIPE_INPUT_OPTIONS = ["-probesize", "64k", "-analyzeduration", "500000"]
+
+
+def ffmpeg_decode_command(path, sample_rate=SAMPLE_RATE, input_options=()):
+    """ffmpeg command that writes resampled mono 16-bit PCM to stdout"""
+    return [
+        "ffmpeg", "-nostdin", "-loglevel", "error", *input_options, "-i", path, "-vn",
+        "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-acodec", "pcm_s16le", "-",
+    ]
+
+
+class PipeSource:
+    """Media written to stdout by another command, decoded while it is produced.
+
+    Used for network streams such as yt-dlp downloads, so transcription can
+    start before the download finishes. duration (seconds) and cache_key
+    identify the content when known, since there is no file to probe or
+    hash. The bytes received and transfer time of the last run are kept
+    for reporting.
+    """
+
+    def __init__(self, command, name, duration=None, cache_key=None):
+        self.command = command
+        self.name = name
+        self.duration = duration
+        self.cache_key = cache_key
+        self.bytes_received = 0
+        self.audio_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def __str__(self):
+        return self.name
+
+    def relay(self, source, destination, block_size=64 * 1024):
+        """Copy the producer's output into ffmpeg, counting bytes as they arrive"""
+        self.bytes_received = 0
+        self.audio_seconds = 0.0
+        self.started = time.monotonic()
+        self.finished = None
+        try:
+            while True:
+                data = source.read1(block_size)
+                if not data:
+                    break
+                self.bytes_received += len(data)
+                destination.write(data)
+        except (OSError, ValueError):
+            # ffmpeg exited or was killed; its own status reports why
+            pass
+        finally:
+            self.finished = time.monotonic()
+            for stream in (destination, source):
+                try:
+                    stream.close()
+                except (OSError, ValueError):
+                    pass
+
+    def metrics(self):
+        """Bytes received, wall time and audio decoded by the last run"""
+        elapsed = ((self.finished or time.monotonic()) - self.started) if self.started else 0.0
+        return {
+            "bytes": self.bytes_received,
+            "seconds": elapsed,
+            "bytes_per_second": self.bytes_received / elapsed if elapsed else 0.0,
+            "audio_seconds": self.audio_seconds,
+        }
+
+    def summary(self):
+        metrics = self.metrics()
+        text = (f"Downloaded {metrics['bytes'] / 1e6:.1f} MB in {metrics['seconds']:.1f} s "
+                f"({metrics['bytes_per_second'] / 1e3:.0f} KB/s)")
+        if metrics["audio_seconds"] and metrics["seconds"]:
+            text += (f", {metrics['audio_seconds']:.0f} s of audio "
+                     f"({metrics['audio_seconds'] / metrics['seconds']:.1f}x realtime)")
+        return text
+
+
+def probe_duration(path):
+    """Duration of a media file in seconds, or None if ffprobe can't tell"""
+    if isinstance(path, PipeSource):
+        return path.duration
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", path],
+            capture_output=True, check=True, timeout=30,
+        ).stdout
+        return float(json.loads(output)["format"]["duration"])
+    except Exception:
+        return None
+
+
+def _kill_on_cancel(process, cancel):
+    """Kill a subprocess when the token is cancelled; returns the unregister function"""
+    if cancel is None:
+        return lambda: None
+
+    def kill():
+        if process.poll() is None:
+            process.kill()
+
+    return cancel.on_cancel(kill)
+
+
+class _Ffmpeg:
+    """ffmpeg reading a media file, or a PipeSource's output relayed to its stdin.
+
+    command(path, input_options) builds the ffmpeg command line. Cancelling
+    the token kills ffmpeg and the producer. Both write their errors to
+    temporary files, so a chatty stderr can't fill a pipe and stall them.
+    """
+
+    def __init__(self, path, command, cancel=None):
+        self.path = path
+        self.cancel = cancel
+        self.producer = None
+        self._producer_errors = None
+        self._relay = None
+        self._errors = tempfile.TemporaryFile()
+        if isinstance(path, PipeSource):
+            self._producer_errors = tempfile.TemporaryFile()
+            self.producer = subprocess.Popen(path.command, stdout=subprocess.PIPE, stderr=self._producer_errors)
+            self.process = subprocess.Popen(
+                command("pipe:0", PIPE_INPUT_OPTIONS),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._errors,
+            )
+            # Decoding starts as soon as the first bytes of the stream arrive
+            self._relay = threading.Thread(
+                target=path.relay, args=(self.producer.stdout, self.process.stdin), daemon=True
+            )
+            self._relay.start()
+        else:
+            self.process = subprocess.Popen(
+                command(path, ()), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=self._errors,
+            )
+        self._unregister = [_kill_on_cancel(p, cancel) for p in (self.process, self.producer) if p]
+
+    def wait(self):
+        """Wait for ffmpeg and the producer to finish; raises Cancelled or RuntimeError on failure"""
+        self.process.wait()
+        if self.producer:
+            self._relay.join()
+            self.producer.wait()
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+        if self.producer and self.producer.returncode:
+            self._producer_errors.seek(0)
+            error = self._producer_errors.read().decode(errors="replace").strip()
+            raise RuntimeError(f"Failed to stream {self.path}: {error}")
+        if self.process.returncode:
+            self._errors.seek(0)
+            error = self._errors.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode {self.path}: {error}")
+
+    def close(self):
+        for unregister in self._unregister:
+            unregister()
+        for process in (self.process, self.producer):
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+        if self._relay:
+            self._relay.join()
+        for stream in (self.process.stdout, self._errors, self._producer_errors):
+            if stream:
+                stream.close()
+
+
+def stream_blocks(path, language=None, block_seconds=BLOCK_SECONDS, sample_rate=SAMPLE_RATE, cancel=None):
+    """Decode a media file or PipeSource through an ffmpeg pipe, yielding float32 blocks.
+
+    When a language is given its band-pass preset is applied to each block
+    with a stateful filter. Only one block is held in memory at a time
+    regardless of file length. Cancelling the token kills ffmpeg and
+    raises Cancelled.
+    """
+    block_bytes = int(block_seconds * sample_rate) * 2
+    chain = FilterChain(language, sample_rate) if language else None
+    ffmpeg = _Ffmpeg(
+        path, lambda source, options: ffmpeg_decode_command(source, sample_rate, options), cancel=cancel
+    )
+    try:
+        pending = b""
+        decoded = 0
+        while True:
+            data = ffmpeg.process.stdout.read(block_bytes)
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            if not data:
+                break
+            data = pending + data
+            # Keep whole samples only; a stray odd byte waits for the next read
+            usable = len(data) - len(data) % 2
+            pending = data[usable:]
+            if usable:
+                decoded += usable // 2
+                if isinstance(path, PipeSource):
+                    path.audio_seconds = decoded / sample_rate
+                block = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+                yield chain.process(block) if chain else block
+        ffmpeg.wait()
+    finally:
+        ffmpeg.close()
+
+
+def stream_chunks(path, language="en-US", chunk_length_ms=15000, normalize_mode=None,
+                  block_seconds=BLOCK_SECONDS, sample_rate=SAMPLE_RATE, cancel=None, levels=None):
+    """Yield (index, start_ms, end_ms, samples) for consecutive chunks of a file.
+
+    ffmpeg decodes and resamples, the DSP stage band-passes each block, and
+    normalization ("peak", "rms" or the language preset's default) is
+    applied per chunk, since whole-file levels are not known until the end
+    of the stream. When a levels dict is given, each chunk's SpeechLevel
+    (measured before normalization) is stored under its index before the
+    chunk is yielded.
+    """
+    normalize_mode = normalize_mode or language_preset(language)["normalize"]
+    chunk_len = max(1, int(sample_rate * chunk_length_ms / 1000))
+    buffer = np.empty(chunk_len, dtype=np.float32)
+    tracker = NoiseFloorTracker(sample_rate) if levels is not None else None
+    filled = 0
+    index = 0
+    position = 0
+
+    def emit(length):
+        if tracker:
+            levels[index] = tracker.measure(buffer[:length])
+        chunk = normalize(buffer[:length].copy(), normalize_mode)
+        start_ms = position * 1000 // sample_rate
+        end_ms = (position + length) * 1000 // sample_rate
+        return index, start_ms, end_ms, chunk
+
+    for block in stream_blocks(path, language, block_seconds, sample_rate, cancel):
+        offset = 0
+        while offset < len(block):
+            take = min(chunk_len - filled, len(block) - offset)
+            buffer[filled:filled + take] = block[offset:offset + take]
+            filled += take
+            offset += take
+            if filled == chunk_len:
+                yield emit(filled)
+                index += 1
+                position += filled
+                filled = 0
+    if filled:
+        yield emit(filled)
+
+
+def stream_speech_chunks(path, language="en-US", max_segment_ms=15000, normalize_mode=None,
+                         block_seconds=BLOCK_SECONDS, sample_rate=SAMPLE_RATE, cancel=None):
+    """Yield (index, start_ms, end_ms, samples) for speech regions of a file.
+
+    Like stream_chunks, but segments follow voice activity: silence is
+    skipped and speech is grouped into segments of up to max_segment_ms.
+    """
+    normalize_mode = normalize_mode or language_preset(language)["normalize"]
+    blocks = stream_blocks(path, language, block_seconds, sample_rate, cancel)
+    for index, start_ms, end_ms, samples in vad_segments(blocks, max_segment_ms, sample_rate=sample_rate):
+        yield index, start_ms, end_ms, normalize(samples, normalize_mode)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the transcription pipeline
+
+Usage: python benchmarks.py <benchmark> [options]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def synthetic_speech(seconds, sample_rate=44100, channels=2, seed=0):
+    """Noisy, amplitude-modulated tones that roughly resemble speech levels"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    voice = 0.3 * envelope * (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 1200 * t))
+    samples = voice + 0.02 * rng.standard_normal(len(t))
+    return np.repeat(samples[:, None], channels, axis=1).astype(np.float32)
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_dsp(args):
+    """Compare the pydub filter/normalize chain with the NumPy/scipy DSP stage"""
+    from pydub import AudioSegment
+    from dsp import prepare_samples
+
+    sample_rate = 44100
+    samples = synthetic_speech(args.seconds, sample_rate)
+    pcm = (samples * 32767).astype("<i2").tobytes()
+    print(f"Input: {args.seconds:.0f} s, {sample_rate} Hz stereo")
+
+    for language in ("en-US", "ar-AR"):
+        def pydub_chain():
+            audio = AudioSegment(data=pcm, sample_width=2, frame_rate=sample_rate, channels=2)
+            if language == "ar-AR":
+                audio = (audio.set_channels(1).set_frame_rate(16000).normalize()
+                         .low_pass_filter(8000).high_pass_filter(100))
+            else:
+                audio = (audio.low_pass_filter(3500).high_pass_filter(300).normalize()
+                         .set_channels(1).set_frame_rate(16000))
+            return audio
+
+        def numpy_chain():
+            return prepare_samples(samples.mean(axis=1), sample_rate, language)
+
+        pydub_time, _ = timed(pydub_chain, args.repeat)
+        numpy_time, _ = timed(numpy_chain, args.repeat)
+        print(f"{language}: pydub {pydub_time * 1000:9.1f} ms   "
+              f"numpy {numpy_time * 1000:9.1f} ms   "
+              f"speedup {pydub_time / max(numpy_time, 1e-9):6.1f}x")
+
+
+def legacy_process_text(text, timestamp):
+    """TranscriptionEngine.process_transcription_text before text_processing.py, for comparison"""
+    import re
+
+    processed_text = text
+    for pattern in [r'\b(background|noise|static|silence|hum|buzz|interference)\b',
+                    r'\b(muffled|unclear|distant|faint)\s+(voice|speech|sound|audio)\b',
+                    r'\b(low|poor)\s+quality\b']:
+        if re.search(pattern, processed_text, re.IGNORECASE):
+            processed_text = f"[inaudible {timestamp}] {processed_text}"
+            break
+    for pattern in [r'\b(unintelligible|incomprehensible|indiscernible)\b',
+                    r'\b(cannot|can\'t)\s+(understand|hear|make out)\b',
+                    r'\b(unclear|inaudible)\s+(speech|words|segment)\b']:
+        if re.search(pattern, processed_text, re.IGNORECASE):
+            processed_text = f"[unintelligible {timestamp}] {processed_text}"
+            break
+    words = processed_text.split()
+    for i, word in enumerate(words):
+        if word.isupper() and len(word) > 1:
+            words[i] = f"**{word}**"
+        elif word.startswith('!') and word.endswith('!'):
+            words[i] = f"*{word}*"
+    processed_text = ' '.join(words)
+    processed_text = re.sub(r'(\b\w+\b)(\s+\1\b)+', r'**\1**', processed_text)
+    processed_text = re.sub(r'\*(\w+)\*', r'*\1*', processed_text)
+    processed_text = re.sub(r'_(\w+)_', r'*\1*', processed_text)
+    processed_text = re.sub(r'\*\*(\w+)\*\*', r'**\1**', processed_text)
+    return processed_text
+
+
+def synthetic_transcript(segments, seed=0):
+    """Segment texts of 20-40 words with occasional noise markers, shouting and repeats"""
+    import random
+
+    rng = random.Random(seed)
+    words = ("so we went to the market and then it started raining and everyone ran inside "
+             "because nobody had brought an umbrella that day which was really unusual").split()
+    extras = ["background noise", "muffled voice", "can't hear", "REALLY", "the the", "_note_", "!wow!"]
+    texts = []
+    for _ in range(segments):
+        text = rng.choices(words, k=rng.randint(20, 40))
+        # Repeats only where inserted below, as in real speech
+        text = [word for i, word in enumerate(text) if not i or word != text[i - 1]]
+        if rng.random() < 0.3:
+            text.insert(rng.randrange(len(text)), rng.choice(extras))
+        texts.append(" ".join(text))
+    timestamps = [f"{i * 15 // 3600:02d}:{i * 15 // 60 % 60:02d}:{i * 15 % 60:02d}" for i in range(segments)]
+    return texts, timestamps
+
+
+def bench_text(args):
+    """Per-segment cost of transcript post-processing on a large transcript"""
+    from text_processing import process_text, process_texts
+
+    texts, timestamps = synthetic_transcript(args.segments)
+    print(f"Input: {args.segments} segments, {sum(len(t) for t in texts) / 1e6:.1f} MB of text")
+
+    legacy_time, legacy = timed(lambda: [legacy_process_text(t, ts) for t, ts in zip(texts, timestamps)], args.repeat)
+    single_time, _ = timed(lambda: [process_text(t, ts) for t, ts in zip(texts, timestamps)], args.repeat)
+    batch_time, processed = timed(lambda: process_texts(texts, timestamps), args.repeat)
+    for name, seconds in (("legacy", legacy_time), ("per segment", single_time), ("whole list", batch_time)):
+        print(f"{name:<12} {seconds * 1000:9.1f} ms   {seconds / args.segments * 1e6:7.2f} us/segment   "
+              f"speedup {legacy_time / max(seconds, 1e-9):5.1f}x")
+    if processed != legacy:
+        print("FAIL: output differs from the legacy implementation")
+        return 1
+    return 0
+
+
+def bench_segments(args):
+    """Memory of a long transcript as segment dicts and as a SegmentStore, and time lookups"""
+    import random
+    import tracemalloc
+    from bisect import bisect_right
+    from segments import SegmentStore
+
+    texts, timestamps = synthetic_transcript(args.segments)
+    rng = random.Random(1)
+    # Short replies arrive as new strings from the recognizer each time
+    replies = [rng.choice(("Okay.", "Yeah.", "Thank you.", "Right.")) if rng.random() < 0.2 else None
+               for _ in texts]
+
+    def rows():
+        for i, (text, timestamp, reply) in enumerate(zip(texts, timestamps, replies)):
+            english = "".join(reply) if reply else text
+            yield i * 15000, i * 15000 + 15000, english, timestamp
+
+    def as_dicts():
+        return [{'timestamp': "".join(timestamp), 'english': english, 'arabic': "",
+                 'start_ms': start_ms, 'end_ms': end_ms}
+                for start_ms, end_ms, english, timestamp in rows()]
+
+    def as_store():
+        store = SegmentStore()
+        for start_ms, end_ms, english, _ in rows():
+            store.add(start_ms, end_ms, english, "")
+        return store
+
+    results = {}
+    for name, build in (("dicts", as_dicts), ("store", as_store)):
+        tracemalloc.start()
+        transcript = build()
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del transcript
+    print(f"Input: {args.segments} segments (long texts already in memory not counted)")
+    for name, size in results.items():
+        print(f"{name:<6} {size / 1e6:8.2f} MB   {size / args.segments:7.1f} bytes/segment")
+    print(f"saving {1 - results['store'] / results['dicts']:.0%}")
+
+    store = as_store()
+    times = [rng.randrange(args.segments * 15000) for _ in range(100000)]
+    lookup_time, found = timed(lambda: [store.index_at(ms) for ms in times], args.repeat)
+    print(f"index_at: {lookup_time / len(times) * 1e6:.2f} us/lookup")
+    if found != [max(0, bisect_right(store.starts, ms) - 1) for ms in times]:
+        print("FAIL: index_at disagrees with a binary search")
+        return 1
+    return 0
+
+
+# Backends that must only be imported when a job actually needs them
+LAZY_MODULES = (
+    "whisper", "torch", "faster_whisper", "ctranslate2", "google.generativeai", "speech_recognition",
+    "yt_dlp", "moviepy", "pydub", "scipy", "asyncio",
+)
+
+
+def import_times(module):
+    """Cumulative import time in microseconds per module, from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_startup(args):
+    """Measure application import time and check that heavy backends stay lazy"""
+    failed = False
+    for entry_point in ("main_app", "cli"):
+        runs = [import_times(entry_point) for _ in range(args.repeat)]
+        times = min(runs, key=lambda t: t.get(entry_point, 0))
+        total_ms = times.get(entry_point, 0) / 1000
+        print(f"{entry_point}: {total_ms:.1f} ms")
+        slowest = sorted((t, m) for m, t in times.items() if m != entry_point and "." not in m)[-5:]
+        for micros, name in reversed(slowest):
+            print(f"    {name:<28} {micros / 1000:8.1f} ms")
+
+        eager = sorted(
+            name for name in times
+            if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+        )
+        if eager:
+            failed = True
+            print(f"    FAIL: imported at startup: {', '.join(eager)}")
+        if args.max_ms and total_ms > args.max_ms:
+            failed = True
+            print(f"    FAIL: {total_ms:.1f} ms exceeds the {args.max_ms:.0f} ms budget")
+    return 1 if failed else 0
+
+
+def mock_api_server(latency=0.05, throttle_rate=0.1, error_rate=0.05, seed=0):
+    """Local HTTP/1.1 server that answers like a flaky, rate-limited API.
+
+    Each request sleeps `latency` seconds, then gets a 429 with Retry-After
+    or a 503 at the given rates, otherwise a small JSON reply. Returns the
+    server (already serving on a daemon thread) with a `stats` dict.
+    """
+    import json
+    import random
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "connections": set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            with lock:
+                stats["requests"] += 1
+                stats["connections"].add(self.client_address)
+                roll = rng.random()
+                outcome = "throttled" if roll < throttle_rate else "errors" if roll < throttle_rate + error_rate else "ok"
+                stats[outcome] += 1
+            if outcome == "throttled":
+                self.reply(429, {"error": {"message": "quota exceeded"}}, {"Retry-After": "0.2"})
+            elif outcome == "errors":
+                self.reply(503, {"error": {"message": "unavailable"}})
+            else:
+                self.reply(200, {"candidates": [{"content": {"parts": [{"text": self.path}]}}]})
+
+        def reply(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_http(args):
+    """Push requests through the rate-limited client against a flaky local mock API"""
+    from http_client import AsyncHttpClient, RetryPolicy
+
+    server = mock_api_server(latency=args.latency, throttle_rate=args.throttle_rate, error_rate=args.error_rate)
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/models/mock:generateContent"
+    client = AsyncHttpClient(
+        requests_per_minute=args.rate * 60 if args.rate else None,
+        max_concurrency=args.concurrency,
+        retry=RetryPolicy(attempts=8, base_delay=0.05, max_delay=1.0),
+    )
+    print(f"{args.requests} requests, {args.concurrency} concurrent, "
+          f"rate limit {f'{args.rate:.0f}/s' if args.rate else 'none'}, "
+          f"{args.throttle_rate:.0%} throttled / {args.error_rate:.0%} failing at the server")
+
+    start = time.perf_counter()
+    futures = [client.submit("POST", f"{url}?n={i}", b"{}") for i in range(args.requests)]
+    lost = 0
+    for i, future in enumerate(futures):
+        try:
+            if future.result().json()["candidates"][0]["content"]["parts"][0]["text"] != f"/v1/models/mock:generateContent?n={i}":
+                lost += 1
+        except Exception:
+            lost += 1
+    elapsed = time.perf_counter() - start
+    client.close()
+    server.shutdown()
+
+    stats = server.stats
+    print(f"Completed in {elapsed:.2f} s ({args.requests / elapsed:.1f} requests/s)")
+    print(f"Server: {stats['requests']} requests over {len(stats['connections'])} connections, "
+          f"{stats['throttled']} throttled, {stats['errors']} failed")
+    print(f"Client: {client.stats['retries']} retries, {client.stats['throttle_seconds']:.2f} s "
+          f"spent waiting on the rate limit, {lost} requests lost")
+    return 1 if lost else 0
+
+
+BENCHMARKS = {
+    "dsp": bench_dsp,
+    "http": bench_http,
+    "segments": bench_segments,
+    "startup": bench_startup,
+    "text": bench_text,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcription pipeline benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--seconds", type=float, default=60.0, help="length of synthetic audio")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    parser.add_argument("--max-ms", type=float, default=None, help="startup: fail above this import time")
+    parser.add_argument("--segments", type=int, default=50000, help="text, segments: transcript segments")
+    parser.add_argument("--requests", type=int, default=200, help="http: requests to send")
+    parser.add_argument("--rate", type=float, default=50.0, help="http: client rate limit per second (0 for none)")
+    parser.add_argument("--concurrency", type=int, default=8, help="http: most requests in flight")
+    parser.add_argument("--latency", type=float, default=0.05, help="http: mock server latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.1, help="http: share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="http: share of requests answered with 503")
+    args = parser.parse_args(argv)
+    return BENCHMARKS[args.benchmark](args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import threading
+
+
+class Cancelled(Exception):
+    """Raised when work stops because its job was cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe stop signal shared by every stage of one job.
+
+    Stages poll cancelled (or call raise_if_cancelled) between units of
+    work, and register callbacks with on_cancel to interrupt blocking
+    operations such as a running subprocess.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancellation callback failed: {e}")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout=None):
+        """Block until cancelled or the timeout passes; returns whether cancelled"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback):
+        """Run callback when the token is cancelled (at once if it already is).
+
+        Returns a function that unregisters the callback.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+def as_token(value):
+    """Accept a token, None or the legacy is_transcribing bool"""
+    if isinstance(value, CancellationToken):
+        return value
+    token = CancellationToken()
+    if value is False:
+        token.cancel()
+    return token
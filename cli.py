@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Headless batch transcription
+
+Transcribes files, directories, glob patterns and YouTube URLs without
+starting the GUI, e.g.:
+
+    python cli.py lectures/ "*.mp3" https://youtu.be/... -o results --jobs 4
+    python cli.py --manifest inputs.txt --language ar-AR --formats json,srt
+"""
+
+import os
+import sys
+import glob
+import argparse
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from audio_processor import AudioProcessor
+from transcription_engine import TranscriptionEngine
+from file_operations import FileOperations
+from exporters import TranscriptWriter, WRITERS
+from recognizers import available_recognizers
+from scheduler import JobScheduler
+
+MEDIA_EXTENSIONS = {
+    ".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm",
+    ".mp3", ".wav", ".aac", ".ogg",
+}
+OUTPUT_FORMATS = ("timestamps", "english", "arabic", "json", "srt", "vtt", "bilingual", "bilingual-vtt")
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def is_url(value):
+    return value.startswith(("http://", "https://"))
+
+
+def expand_inputs(items):
+    """Resolve files, directories, glob patterns and URLs into a de-duplicated job list"""
+    inputs = []
+    for item in items:
+        if is_url(item):
+            inputs.append(item)
+        elif os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                        inputs.append(os.path.join(root, name))
+        elif os.path.isfile(item):
+            inputs.append(item)
+        else:
+            matches = sorted(glob.glob(item, recursive=True))
+            if not matches:
+                log(f"Warning: no files match {item}")
+            inputs.extend(m for m in matches if os.path.isfile(m))
+    seen = set()
+    return [i for i in inputs if not (i in seen or seen.add(i))]
+
+
+def read_manifest(path):
+    """One file path, directory, glob or URL per line; blank lines and # comments are ignored.
+
+    Relative paths are taken relative to the manifest's own directory.
+    """
+    base = os.path.dirname(path)
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    return [line if is_url(line) else os.path.join(base, os.path.expanduser(line)) for line in lines]
+
+
+class BatchRunner:
+    """Runs transcription jobs from the command line with job-level concurrency"""
+
+    def __init__(self, args):
+        self.args = args
+        self._names = set()
+        self._names_lock = threading.Lock()
+
+    def make_engine(self, progress):
+        args = self.args
+        engine = TranscriptionEngine(progress_callback=progress)
+        engine.set_language(args.language)
+        engine.set_gemini_api_key(args.api_key)
+        engine.set_translate_option(args.translate)
+        engine.set_segmentation("vad" if args.skip_silence else "fixed")
+        engine.set_noise_gate(not args.no_noise_gate)
+        engine.set_whisper_model(args.model, args.device)
+        engine.set_whisper_batch_size(args.batch_size)
+        engine.set_execution_backend(args.backend, args.workers)
+        if args.recognizer:
+            engine.set_recognizer(args.language, args.recognizer)
+        if args.workers and args.backend == "thread":
+            engine.max_workers_english = args.workers
+            engine.max_workers_arabic = args.workers
+        return engine
+
+    def output_base(self, title):
+        """Unique output path prefix for a job title"""
+        title = AudioProcessor().sanitize_filename(title) or "transcript"
+        with self._names_lock:
+            name, n = title, 1
+            while name in self._names:
+                n += 1
+                name = f"{title}_{n}"
+            self._names.add(name)
+        return os.path.join(self.args.output_dir, name)
+
+    def run_job(self, input_path, job):
+        """Transcribe one input and write its outputs; returns True on success"""
+        args = self.args
+        cancel = job.cancel_token
+        label = os.path.basename(input_path) if not is_url(input_path) else input_path
+
+        def progress(message):
+            job.set_progress(message=message)
+            if not args.quiet:
+                log(f"[{label}] {message}")
+
+        written = []
+        try:
+            processor = AudioProcessor(progress_callback=progress)
+            if processor.is_youtube_url(input_path):
+                audio_path, title = processor.open_youtube_stream(input_path, cancel)
+            else:
+                audio_path, title = processor.open_local_file(input_path)
+            if cancel.cancelled:
+                log(f"[{label}] Cancelled")
+                return False
+            if not audio_path:
+                log(f"[{label}] Failed: could not read audio")
+                return False
+
+            engine = self.make_engine(progress)
+            base_name = self.output_base(title)
+            # Without Arabic correction the segments are final as they arrive,
+            # so those outputs are written while the job runs. The Arabic text
+            # file is left for the end, as it is only written if there is any
+            streamed = [] if args.correct_arabic else [
+                f for f in dict.fromkeys(args.formats) if f in WRITERS and f != "arabic"
+            ]
+            writer = TranscriptWriter.open(base_name, streamed) if streamed else None
+            try:
+                transcription_data = engine.transcribe_audio_segments(
+                    audio_path, args.segment_length, cancel,
+                    segment_callback=writer.append if writer else None, job=job
+                )
+            finally:
+                written = writer.close() if writer else []
+
+            if cancel.cancelled or not transcription_data:
+                self.remove_outputs(written)
+                if cancel.cancelled:
+                    log(f"[{label}] Cancelled")
+                else:
+                    log(f"[{label}] Failed: no segments transcribed")
+                return False
+
+            file_operations = FileOperations(args.api_key if args.correct_arabic else "")
+            remaining = [f for f in args.formats if f not in streamed]
+            written += file_operations.write_results(transcription_data, base_name, remaining, progress)
+            log(f"[{label}] Done: {len(transcription_data)} segments -> {', '.join(written)}")
+            return True
+        except Exception as e:
+            self.remove_outputs(written)
+            log(f"[{label}] Failed: {e}")
+            return False
+
+    def remove_outputs(self, paths):
+        """Delete the partial outputs of a job that didn't finish"""
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def status_line(self, scheduler):
+        status = scheduler.status()
+        running = [
+            f"{job['name']} {job['completed']}/{job['total'] or '?'}"
+            for job in status["jobs"] if job["state"] == "running"
+        ]
+        return (f"Status: {status['running_jobs']} running, {status['queued_jobs']} queued, "
+                f"{status['busy_workers']}/{status['workers']} workers busy"
+                + (f" ({'; '.join(running)})" if running else ""))
+
+    def run(self, inputs):
+        os.makedirs(self.args.output_dir, exist_ok=True)
+        # One worker pool for all jobs; --jobs only limits how many run at once
+        scheduler = JobScheduler(workers=self.args.threads, max_running_jobs=self.args.jobs)
+        jobs = [scheduler.submit(os.path.basename(i) or i, lambda job, i=i: self.run_job(i, job)) for i in inputs]
+        try:
+            for job in jobs:
+                while True:
+                    try:
+                        job.result(timeout=self.args.status_interval or None)
+                        break
+                    except FutureTimeout:
+                        if not self.args.quiet:
+                            log(self.status_line(scheduler))
+            results = [job.result() for job in jobs]
+        except KeyboardInterrupt:
+            log("Interrupted, cancelling running jobs...")
+            scheduler.shutdown(cancel=True)
+            return False
+        scheduler.shutdown()
+        failed = results.count(False)
+        log(f"Finished {len(inputs)} job(s): {len(inputs) - failed} succeeded, {failed} failed")
+        return failed == 0
+
+
+def parse_formats(value):
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format(s): {', '.join(unknown)}")
+    return formats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Transcribe media files and YouTube URLs without the GUI")
+    parser.add_argument("inputs", nargs="*", help="files, directories, glob patterns or YouTube URLs")
+    parser.add_argument("-m", "--manifest", help="text file listing one input per line")
+    parser.add_argument("-o", "--output-dir", default="transcripts", help="where to write results")
+    parser.add_argument("-l", "--language", default="en-US", choices=["en-US", "ar-AR"])
+    parser.add_argument("-s", "--segment-length", type=float, default=15.0, help="segment length in seconds")
+    parser.add_argument("--skip-silence", action="store_true", help="segment on speech and skip silence")
+    parser.add_argument("--no-noise-gate", action="store_true",
+                        help="send fixed-length segments without speech to the recognizer anyway")
+    parser.add_argument("--translate", action="store_true", help="translate with Gemini (needs an API key)")
+    parser.add_argument("--correct-arabic", action="store_true", help="correct Arabic output with Gemini")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY", ""),
+                        help="Gemini API key (default: $GEMINI_API_KEY)")
+    parser.add_argument("--formats", type=parse_formats, default=["timestamps", "english", "arabic", "json"],
+                        help=f"comma separated outputs from: {', '.join(OUTPUT_FORMATS)}")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="files transcribed concurrently")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="segment worker threads shared by all jobs (default: CPU count)")
+    parser.add_argument("--status-interval", type=float, default=30.0,
+                        help="seconds between queue/progress status lines (0 disables)")
+    parser.add_argument("--backend", default="thread", choices=["thread", "process"],
+                        help="execution backend for recognition")
+    parser.add_argument("--workers", type=int, default=None, help="most recognition workers per job")
+    parser.add_argument("--recognizer", choices=available_recognizers(), default=None,
+                        help="speech recognizer (default: google for en-US, whisper for ar-AR)")
+    parser.add_argument("--model", default="medium", help="Whisper model size")
+    parser.add_argument("--device", default=None, help="Whisper device (default: cuda if available)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Whisper batch size")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print job results")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    items = list(args.inputs)
+    if args.manifest:
+        items.extend(read_manifest(args.manifest))
+    if not items:
+        parser.error("no inputs given")
+
+    inputs = expand_inputs(items)
+    if not inputs:
+        log("Nothing to transcribe")
+        return 1
+
+    log(f"Transcribing {len(inputs)} input(s) with {args.jobs} concurrent job(s)")
+    return 0 if BatchRunner(args).run(inputs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+from math import gcd
+
+import numpy as np
+
+from audio_buffer import SAMPLE_RATE
+
+# Band-pass presets per language, matching the original pydub chains
+# (high_pass_filter / low_pass_filter cutoffs in Hz)
+LANGUAGE_PRESETS = {
+    "ar-AR": {"high_pass": 100, "low_pass": 8000, "normalize": "peak"},
+    "en-US": {"high_pass": 300, "low_pass": 3500, "normalize": "peak"},
+}
+
+# Gain target used by pydub's AudioSegment.normalize()
+PEAK_HEADROOM_DB = 0.1
+RMS_TARGET_DBFS = -20.0
+# Most a segment is amplified by, so a segment of only faint noise isn't
+# brought up to full scale
+MAX_GAIN_DB = 30.0
+
+
+def _signal():
+    # scipy is slow to import; load it on first use rather than at startup
+    from scipy import signal
+    return signal
+
+
+def language_preset(language):
+    return LANGUAGE_PRESETS.get(language, LANGUAGE_PRESETS["en-US"])
+
+
+def design_bandpass(high_pass, low_pass, sample_rate=SAMPLE_RATE, order=1):
+    """Butterworth band-pass as second-order sections.
+
+    Order 1 gives the same 6 dB/octave slopes as pydub's single-pole
+    filters, in one pass instead of two. A low-pass cutoff at or above
+    Nyquist degenerates to a plain high-pass.
+    """
+    nyquist = sample_rate / 2
+    if low_pass >= nyquist:
+        return _signal().butter(order, high_pass, btype="highpass", fs=sample_rate, output="sos")
+    return _signal().butter(order, [high_pass, low_pass], btype="bandpass", fs=sample_rate, output="sos")
+
+
+class FilterChain:
+    """Stateful band-pass filter that can be fed audio block by block.
+
+    Filter state carries over between calls, so filtering a stream in
+    blocks gives the same result as filtering it in one piece.
+    """
+
+    def __init__(self, language="en-US", sample_rate=SAMPLE_RATE):
+        preset = language_preset(language)
+        self.sos = design_bandpass(preset["high_pass"], preset["low_pass"], sample_rate)
+        self._zi = np.zeros((self.sos.shape[0], 2))
+
+    def process(self, block):
+        filtered, self._zi = _signal().sosfilt(self.sos, block, zi=self._zi)
+        return filtered.astype(np.float32, copy=False)
+
+    def reset(self):
+        self._zi[:] = 0
+
+
+def normalize_peak(samples, headroom_db=PEAK_HEADROOM_DB, max_gain_db=MAX_GAIN_DB):
+    """Scale samples so the peak sits headroom_db below full scale, by at most max_gain_db"""
+    peak = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    if peak <= 0:
+        return samples
+    gain = min(10 ** (-headroom_db / 20) / peak, 10 ** (max_gain_db / 20))
+    return samples * np.float32(gain)
+
+
+def normalize_rms(samples, target_dbfs=RMS_TARGET_DBFS, max_gain_db=MAX_GAIN_DB):
+    """Scale samples to a target RMS level by at most max_gain_db, clipping to full scale"""
+    if not len(samples):
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    if rms <= 0:
+        return samples
+    gain = min(10 ** (target_dbfs / 20) / rms, 10 ** (max_gain_db / 20))
+    return np.clip(samples * np.float32(gain), -1.0, 1.0)
+
+
+def normalize(samples, mode="peak"):
+    if mode == "peak":
+        return normalize_peak(samples)
+    if mode == "rms":
+        return normalize_rms(samples)
+    return samples
+
+
+def resample(samples, orig_rate, target_rate=SAMPLE_RATE):
+    """Polyphase resampling to the target rate"""
+    if orig_rate == target_rate:
+        return samples
+    divisor = gcd(int(orig_rate), int(target_rate))
+    resampled = _signal().resample_poly(samples, target_rate // divisor, orig_rate // divisor)
+    return resampled.astype(np.float32, copy=False)
+
+
+def prepare_samples(samples, sample_rate, language="en-US", normalize_mode=None):
+    """Full preprocessing chain on an in-memory buffer: resample, band-pass, normalize"""
+    preset = language_preset(language)
+    samples = resample(np.asarray(samples, dtype=np.float32), sample_rate, SAMPLE_RATE)
+    samples = FilterChain(language).process(samples)
+    return normalize(samples, normalize_mode or preset["normalize"])
@@ -0,0 +1,251 @@
+import json
+
+# A cue with no usable end time (e.g. from an old JSON file) lasts this long
+DEFAULT_CUE_MS = 2000
+
+
+def format_subtitle_time(ms, separator):
+    """ "HH:MM:SS,mmm" (SRT) or "HH:MM:SS.mmm" (VTT) for a time in milliseconds"""
+    seconds, millis = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+def cue_text(text):
+    """Text worth showing as a subtitle; "" for empty segments and bare markers like "[No speech detected]".
+
+    Blank lines are dropped, since one would end the cue.
+    """
+    if not text or (text.startswith('[') and text.endswith(']')):
+        return ""
+    return "\n".join(line for line in text.splitlines() if line.strip())
+
+
+def cue_end_ms(segment, next_start_ms=None):
+    """End of a segment's cue: its own end, cut off where the next segment starts"""
+    end_ms = segment.end_ms
+    if next_start_ms is not None and end_ms > next_start_ms:
+        end_ms = next_start_ms
+    if end_ms <= segment.start_ms:
+        if next_start_ms is not None and next_start_ms > segment.start_ms:
+            end_ms = next_start_ms
+        else:
+            end_ms = segment.start_ms + DEFAULT_CUE_MS
+    return end_ms
+
+
+class FormatWriter:
+    """One output file, written a segment at a time"""
+
+    suffix = ""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def write(self, segment, end_ms):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def close(self):
+        try:
+            self.end()
+        finally:
+            self.file.close()
+
+
+class TimestampsWriter(FormatWriter):
+    suffix = "_timestamps.txt"
+
+    def write(self, segment, end_ms):
+        self.file.write(f"{segment.timestamp}: {segment.english}\n")
+
+
+class EnglishWriter(FormatWriter):
+    suffix = "_english.txt"
+
+    def write(self, segment, end_ms):
+        if segment.english and not segment.english.startswith('['):
+            self.file.write(f"{segment.english} ")
+
+
+class ArabicWriter(FormatWriter):
+    """Arabic text laid out as a conversation, with a blank line before each speaker turn"""
+
+    suffix = "_arabic.txt"
+
+    def begin(self):
+        self.file.write("المحادثة:\n")
+        self.file.write("=" * 40 + "\n\n")
+
+    def write(self, segment, end_ms):
+        if not segment.arabic or segment.arabic.startswith('['):
+            return
+        for line in segment.arabic.split('\n'):
+            if line.strip():
+                if line.strip().startswith('-') or ':' in line:
+                    self.file.write('\n')
+                self.file.write(line + '\n')
+
+
+class JsonWriter(FormatWriter):
+    """The same layout as json.dump(segments, indent=2), one segment at a time"""
+
+    suffix = "_complete.json"
+
+    def begin(self):
+        self.file.write("[")
+
+    def write(self, segment, end_ms):
+        item = json.dumps(segment.to_dict(), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.file.write(f"{',' if self.count else ''}\n  {item}")
+        self.count += 1
+
+    def end(self):
+        self.file.write("\n]" if self.count else "]")
+
+
+class SrtWriter(FormatWriter):
+    """English cues, or Arabic ones where there is no English (an untranslated Arabic job)"""
+
+    suffix = ".srt"
+    separator = ","
+
+    def text(self, segment):
+        return cue_text(segment.english) or cue_text(segment.arabic)
+
+    def write(self, segment, end_ms):
+        text = self.text(segment)
+        if not text:
+            return
+        self.count += 1
+        self.file.write(f"{self.count}\n{self.cue_times(segment, end_ms)}\n{text}\n\n")
+
+    def cue_times(self, segment, end_ms):
+        return (f"{format_subtitle_time(segment.start_ms, self.separator)} --> "
+                f"{format_subtitle_time(end_ms, self.separator)}")
+
+
+class VttWriter(SrtWriter):
+    suffix = ".vtt"
+    separator = "."
+
+    def begin(self):
+        self.file.write("WEBVTT\n\n")
+
+    def write(self, segment, end_ms):
+        text = self.text(segment)
+        if text:
+            self.file.write(f"{self.cue_times(segment, end_ms)}\n{text}\n\n")
+
+
+class BilingualSrtWriter(SrtWriter):
+    """English above Arabic in each cue"""
+
+    suffix = "_bilingual.srt"
+
+    def text(self, segment):
+        return "\n".join(text for text in (cue_text(segment.english), cue_text(segment.arabic)) if text)
+
+
+class BilingualVttWriter(VttWriter):
+    suffix = "_bilingual.vtt"
+    text = BilingualSrtWriter.text
+
+
+WRITERS = {
+    "timestamps": TimestampsWriter,
+    "english": EnglishWriter,
+    "arabic": ArabicWriter,
+    "json": JsonWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "bilingual": BilingualSrtWriter,
+    "bilingual-vtt": BilingualVttWriter,
+}
+
+
+class TranscriptWriter:
+    """Writes segments to several formats in one pass, as they arrive.
+
+    Each segment is held back until the next one (or close()) so its cue
+    can end where the next begins. append() flushes, so the files on disk
+    keep up with a running transcription; extend() flushes once.
+    """
+
+    def __init__(self, writers):
+        self.writers = writers
+        self._pending = None
+
+    @classmethod
+    def open(cls, base_name, formats):
+        """Writers for `formats` (keys of WRITERS) at base_name plus each format's suffix"""
+        writers = []
+        try:
+            for name in formats:
+                writers.append(WRITERS[name](base_name + WRITERS[name].suffix))
+        except BaseException:
+            for writer in writers:
+                writer.close()
+            raise
+        return cls(writers)
+
+    @property
+    def paths(self):
+        return [writer.path for writer in self.writers]
+
+    def append(self, segment):
+        self._add(segment)
+        self.flush()
+
+    def extend(self, segments):
+        for segment in segments:
+            self._add(segment)
+        self.flush()
+
+    def flush(self):
+        for writer in self.writers:
+            writer.file.flush()
+
+    def close(self):
+        """Write the last segment, finish every file and return their paths"""
+        try:
+            if self._pending is not None:
+                self._write(self._pending, None)
+                self._pending = None
+        finally:
+            for writer in self.writers:
+                writer.close()
+        return self.paths
+
+    def _add(self, segment):
+        if self._pending is not None:
+            self._write(self._pending, segment.start_ms)
+        self._pending = segment
+
+    def _write(self, segment, next_start_ms):
+        end_ms = cue_end_ms(segment, next_start_ms)
+        for writer in self.writers:
+            writer.write(segment, end_ms)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_transcript(segments, base_name, formats):
+    """Write every format in one pass over segments; returns the written paths"""
+    writer = TranscriptWriter.open(base_name, formats)
+    with writer:
+        writer.extend(segments)
+    return writer.paths
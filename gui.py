@@ -7,6 +7,8 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import re
 import json
+from segments import SegmentStore
+from transcript_view import TranscriptView
 
 class TranscriptionGUI:
     def __init__(self, root):
@@ -15,12 +17,13 @@ class TranscriptionGUI:
         self.root.geometry("1200x800")
         
         self.current_audio_path = None
-        self.transcription_data = []
+        self.transcription_data = SegmentStore()
         self.is_transcribing = False
         self.gemini_api_key = ""
         cpu_count = os.cpu_count() or 4
         self.max_workers_english = min(6, max(2, cpu_count))  
         self.max_workers_arabic = 1  
+        self.whisper_batch_size = 1  
         self.language_var = tk.StringVar(value="en-US")  
         
         self.setup_ui()
@@ -89,6 +92,14 @@ class TranscriptionGUI:
         self.segment_combo = ttk.Combobox(segment_frame, textvariable=self.segment_length, values=segment_values, width=5)
         self.segment_combo.pack(side=tk.LEFT, padx=5)
         
+        # Voice activity detection skips silence and cuts at pauses
+        self.skip_silence_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(segment_frame, text="Skip silence", variable=self.skip_silence_var).pack(side=tk.LEFT, padx=5)
+        
+        # Noise gate: fixed-length segments without speech skip the recognizer
+        self.noise_gate_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(segment_frame, text="Noise gate", variable=self.noise_gate_var).pack(side=tk.LEFT, padx=5)
+        
         self.start_button = ttk.Button(control_frame, text="Start Transcription", command=self.start_transcription)
         self.start_button.pack(side=tk.LEFT, padx=5)
         
@@ -118,32 +129,22 @@ class TranscriptionGUI:
         results_frame = ttk.LabelFrame(main_frame, text="Transcription Results", padding="5")
         results_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
         results_frame.columnconfigure(0, weight=1)
-        results_frame.rowconfigure(0, weight=1)
-        
-        # Create Treeview for results
-        self.tree = ttk.Treeview(results_frame, columns=('timestamp', 'english', 'arabic'), show='headings', height=15)
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Configure columns
-        self.tree.heading('timestamp', text='Timestamp')
-        self.tree.heading('english', text='English Text')
-        self.tree.heading('arabic', text='Arabic Text')
-        
-        self.tree.column('timestamp', width=120, minwidth=100)
-        self.tree.column('english', width=400, minwidth=300)
-        self.tree.column('arabic', width=400, minwidth=300)
-        
-        # Scrollbars for treeview
-        v_scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=v_scrollbar.set)
-        
-        h_scrollbar = ttk.Scrollbar(results_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
-        self.tree.configure(xscrollcommand=h_scrollbar.set)
-        
-        # Bind click event to tree
-        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        results_frame.rowconfigure(1, weight=1)
+        
+        # Jump to a time in the transcript
+        jump_frame = ttk.Frame(results_frame)
+        jump_frame.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(jump_frame, text="Jump to (HH:MM:SS):").pack(side=tk.LEFT, padx=5)
+        self.jump_var = tk.StringVar()
+        jump_entry = ttk.Entry(jump_frame, textvariable=self.jump_var, width=10)
+        jump_entry.pack(side=tk.LEFT, padx=5)
+        jump_entry.bind('<Return>', lambda event: self.jump_to_timestamp())
+        ttk.Button(jump_frame, text="Go", command=self.jump_to_timestamp).pack(side=tk.LEFT, padx=5)
+        
+        # Only the visible rows exist as tree items, however long the transcript
+        self.transcript_view = TranscriptView(results_frame, self.transcription_data, on_select=self.on_segment_select)
+        self.transcript_view.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.tree = self.transcript_view.tree
         
         # Current transcription display
         current_frame = ttk.LabelFrame(main_frame, text="Current Segment", padding="5")
@@ -200,22 +201,31 @@ class TranscriptionGUI:
         if filename:
             self.input_var.set(filename)
     
-    def on_tree_select(self, event):
-        selected_items = self.tree.selection()
-        if selected_items:
-            # Get values of the selected row
-            item = selected_items[0]
-            values = self.tree.item(item)['values']
-            if values:
-                # values[1] is English text, values[2] is Arabic text
-                self.update_current_display(values[1], values[2])
+    def on_segment_select(self, index, segment):
+        self.update_current_display(segment.english, segment.arabic)
+    
+    def jump_to_timestamp(self):
+        if self.transcript_view.jump_to_timestamp(self.jump_var.get()) is None:
+            messagebox.showwarning("Jump to time", "Enter a time as HH:MM:SS, MM:SS or seconds")
     
     def add_to_tree(self, data):
-        self.tree.insert('', tk.END, values=(data['timestamp'], data['english'], data['arabic']))
-        # Auto-scroll to the latest entry
-        items = self.tree.get_children()
-        if items:
-            self.tree.see(items[-1])
+        self.add_rows([data])
+    
+    def add_rows(self, segments):
+        """Append segments to the transcript and show the last one, redrawing once per batch"""
+        if not segments:
+            return
+        self.transcription_data.extend(segments)
+        # Follows the latest entry unless the user has scrolled back
+        self.transcript_view.refresh()
+        last = segments[-1]
+        self.update_current_display(last.english, last.arabic)
+    
+    def clear_results(self):
+        self.transcription_data = SegmentStore()
+        self.transcript_view.set_segments(self.transcription_data)
+        self.current_text.delete(1.0, tk.END)
+        self.current_text_arabic.delete(1.0, tk.END)
     
     def update_current_display(self, english_text, arabic_text=""):
         self.current_text.delete(1.0, tk.END)
@@ -237,12 +247,9 @@ class TranscriptionGUI:
     
     def get_current_timestamp(self):
         """Get timestamp from currently selected segment"""
-        selected_items = self.tree.selection()
-        if selected_items:
-            item = selected_items[0]
-            values = self.tree.item(item)['values']
-            if values:
-                return values[0]  # timestamp is the first value
+        segment = self.transcript_view.selected_segment()
+        if segment:
+            return segment.timestamp
         return "00:00:00"
         
     def format_text(self, widget, format_type):
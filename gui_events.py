@@ -0,0 +1,90 @@
+from collections import deque
+
+_PROGRESS = "progress"
+_ROWS = "rows"
+_CALL = "call"
+
+
+class GuiEventQueue:
+    """Thread-safe queue of GUI updates, drained on the Tk thread by a timer.
+
+    Worker threads post progress messages, result rows and callbacks;
+    nothing touches Tk outside the timer. Each tick hands every row posted
+    since the last one to on_rows as a single list (at most max_rows, the
+    rest follow on the next tick), shows only the latest progress message,
+    and runs callbacks in the order they were posted relative to both.
+
+    Rows and progress may be tagged (e.g. with the job that produced them);
+    once set_current() names another tag, those still queued with an old
+    tag are dropped. Callbacks always run.
+    """
+
+    def __init__(self, root, on_rows, on_progress, interval_ms=100, max_rows=1000):
+        self.root = root
+        self.on_rows = on_rows
+        self.on_progress = on_progress
+        self.interval_ms = interval_ms
+        self.max_rows = max_rows
+        # deque.append and popleft are atomic, so posting needs no lock
+        self._events = deque()
+        self._timer = None
+        self.current = None
+
+    def start(self):
+        if self._timer is None:
+            self._timer = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+
+    def post_progress(self, message, tag=None):
+        self._events.append((_PROGRESS, message, tag))
+
+    def post_row(self, row, tag=None):
+        self._events.append((_ROWS, row, tag))
+
+    def call(self, callback):
+        """Run callback on the Tk thread after everything posted before it"""
+        self._events.append((_CALL, callback, None))
+
+    def set_current(self, tag):
+        """Drop rows and progress tagged with anything but tag from now on"""
+        self.current = tag
+
+    def drain(self, max_rows=None):
+        """Apply pending events now; returns whether any are left over"""
+        max_rows = max_rows or self.max_rows
+        rows = []
+        progress = None
+        while self._events and len(rows) < max_rows:
+            kind, payload, tag = self._events.popleft()
+            if tag is not None and tag is not self.current:
+                continue
+            if kind == _ROWS:
+                rows.append(payload)
+            elif kind == _PROGRESS:
+                progress = payload
+            else:
+                self._flush(rows, progress)
+                rows, progress = [], None
+                try:
+                    payload()
+                except Exception as e:
+                    print(f"GUI callback failed: {e}")
+        self._flush(rows, progress)
+        return bool(self._events)
+
+    def _flush(self, rows, progress):
+        if rows:
+            self.on_rows(rows)
+        if progress is not None:
+            self.on_progress(progress)
+
+    def _tick(self):
+        try:
+            backlog = self.drain()
+        finally:
+            # Catch up quickly on a backlog, but let Tk handle input in between
+            self._timer = self.root.after(1 if backlog else self.interval_ms, self._tick)
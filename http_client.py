@@ -0,0 +1,372 @@
+import os
+import ssl
+import json
+import time
+import base64
+import random
+import socket
+import asyncio
+import threading
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass_environment
+
+# Status codes worth retrying: rate limited or a transient server problem
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+
+# Per-service limits; each can be overridden with <NAME>_REQUESTS_PER_MINUTE
+# and <NAME>_MAX_CONCURRENCY environment variables. Processes that are one
+# of N sharing a quota (process backend workers) set HTTP_RATE_SHARE=N and
+# get 1/N of each limit
+SERVICES = {
+    "speech": {"requests_per_minute": 300, "max_concurrency": 8},
+    "gemini": {"requests_per_minute": 60, "max_concurrency": 4},
+}
+
+
+class HttpError(Exception):
+    """A request failed with an HTTP error status"""
+
+    def __init__(self, status, reason, body=b""):
+        super().__init__(f"HTTP {status} {reason}".strip())
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class Response:
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpError(self.status, self.reason, self.body)
+        return self
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return waited
+            delay = (1 - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every request for a while, e.g. after a 429 from the server"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, honoring Retry-After"""
+
+    def __init__(self, attempts=5, base_delay=0.5, max_delay=30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return backoff * random.uniform(0.5, 1.0)
+
+
+def _retry_after(headers):
+    try:
+        return max(0.0, float(headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+class AsyncHttpClient:
+    """Rate-limited, retrying HTTP/1.1 client on its own asyncio event loop.
+
+    Requests from any thread go through one token bucket and one
+    concurrency limit, so many transcription workers together stay within
+    a service's quota. Connections are kept alive and reused per host.
+    Connection errors, timeouts and RETRY_STATUSES are retried with
+    exponential backoff; a 429 also pauses the bucket for Retry-After.
+    Redirects are followed like urllib does, and HTTP_PROXY, HTTPS_PROXY
+    and NO_PROXY are honoured (HTTPS goes through a CONNECT tunnel).
+
+    submit() returns a concurrent.futures.Future for use from threads,
+    request() blocks for the response, and fetch() is the coroutine both
+    are built on.
+    """
+
+    def __init__(self, requests_per_minute=None, burst=None, max_concurrency=8,
+                 retry=None, timeout=60.0, ssl_context=None, proxies=None):
+        rate = requests_per_minute / 60 if requests_per_minute else None
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_concurrency = max_concurrency
+        self.retry = retry or RetryPolicy()
+        self.timeout = timeout
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rate_limited": 0, "throttle_seconds": 0.0}
+        self._ssl = ssl_context
+        self._proxies = getproxies() if proxies is None else proxies
+        self._idle = {}             # (scheme, host, port, proxy) -> [(reader, writer)]
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="http-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, method, url, body=None, headers=None):
+        """Schedule a request; the future resolves to a Response"""
+        return asyncio.run_coroutine_threadsafe(self.fetch(method, url, body, headers), self._ensure_loop())
+
+    def request(self, method, url, body=None, headers=None):
+        return self.submit(method, url, body, headers).result()
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop:
+            asyncio.run_coroutine_threadsafe(self._close_idle(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def fetch(self, method, url, body=None, headers=None):
+        """Send a request with rate limiting and retries; returns the final Response.
+
+        Responses with non-retryable error statuses are returned as is; a
+        retryable failure that persists after the last attempt raises.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        attempts = max(1, self.retry.attempts)
+        error = None
+        for attempt in range(attempts):
+            if self.bucket:
+                self.stats["throttle_seconds"] += await self.bucket.acquire()
+            retry_after = None
+            async with self._semaphore:
+                self.stats["requests"] += 1
+                try:
+                    response = await asyncio.wait_for(self._follow(method, url, body, headers), self.timeout)
+                except (OSError, EOFError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                    error = e
+                else:
+                    if response.status not in RETRY_STATUSES:
+                        return response
+                    error = HttpError(response.status, response.reason, response.body)
+                    retry_after = _retry_after(response.headers)
+                    if response.status == 429:
+                        self.stats["rate_limited"] += 1
+                        if self.bucket:
+                            self.bucket.pause(retry_after or self.retry.delay(attempt))
+            if attempt + 1 < attempts:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry.delay(attempt, retry_after))
+        self.stats["failures"] += 1
+        raise error
+
+    async def _follow(self, method, url, body, headers):
+        """_send, following redirects"""
+        for _ in range(MAX_REDIRECTS):
+            response = await self._send(method, url, body, headers)
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+            if response.status in (301, 302, 303) and method not in ("GET", "HEAD"):
+                # As browsers and urllib do: the redirected request is a GET without a body
+                method, body = "GET", None
+                headers = {name: value for name, value in (headers or {}).items()
+                           if name.lower() not in ("content-type", "content-length")}
+        return await self._send(method, url, body, headers)
+
+    def _proxy_for(self, parts):
+        """The proxy URL to use for a request, or None"""
+        proxy = self._proxies.get(parts.scheme)
+        if not proxy or proxy_bypass_environment(parts.hostname, self._proxies):
+            return None
+        return urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+    async def _send(self, method, url, body, headers):
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        port = parts.port or (443 if secure else 80)
+        proxy = self._proxy_for(parts)
+        proxy_address = (proxy.hostname, proxy.port or 8080) if proxy else None
+        key = (parts.scheme, parts.hostname, port, proxy_address)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = []
+        if proxy and not secure:
+            # Plain HTTP goes to the proxy with the full URL as the target
+            target = f"http://{parts.netloc}{target}"
+            lines += _proxy_headers(proxy)
+        body = body or b""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}",
+                 f"Content-Length: {len(body)}", "Connection: keep-alive"] + lines
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            try:
+                return await self._exchange(key, reader, writer, payload, method)
+            except (OSError, EOFError, asyncio.IncompleteReadError):
+                # The server closed a kept-alive connection; try the next one
+                writer.close()
+        ssl_context = (self._ssl or ssl.create_default_context()) if secure else None
+        if proxy and secure:
+            sock = await asyncio.get_running_loop().run_in_executor(
+                None, _open_tunnel, proxy, proxy_address, parts.hostname, port, self.timeout
+            )
+            reader, writer = await asyncio.open_connection(sock=sock, ssl=ssl_context, server_hostname=parts.hostname)
+        elif proxy:
+            reader, writer = await asyncio.open_connection(*proxy_address)
+        else:
+            reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=ssl_context)
+        return await self._exchange(key, reader, writer, payload, method)
+
+    async def _exchange(self, key, reader, writer, payload, method):
+        try:
+            writer.write(payload)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise EOFError("connection closed before response")
+            _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close"
+            if method == "HEAD" or int(status) in (204, 304):
+                body = b""
+            elif headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif "content-length" in headers:
+                body = await reader.readexactly(int(headers["content-length"]))
+            else:
+                body = await reader.read()
+                keep_alive = False
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        return Response(int(status), reason[0] if reason else "", headers, body)
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def _close_idle(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+def _proxy_headers(proxy):
+    if proxy.username is None:
+        return []
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return [f"Proxy-Authorization: Basic {base64.b64encode(credentials.encode()).decode('ascii')}"]
+
+
+def _open_tunnel(proxy, proxy_address, host, port, timeout):
+    """Blocking: a socket to host:port through an HTTP proxy's CONNECT tunnel"""
+    sock = socket.create_connection(proxy_address, timeout=timeout)
+    try:
+        lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"] + _proxy_headers(proxy)
+        sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        reply = b""
+        while b"\r\n\r\n" not in reply:
+            data = sock.recv(4096)
+            if not data:
+                raise OSError("proxy closed the connection")
+            reply += data
+        status = reply.split(b"\r\n", 1)[0].decode("latin-1")
+        if status.split(" ")[1:2] != ["200"]:
+            raise OSError(f"proxy refused the tunnel: {status}")
+        sock.settimeout(None)
+        return sock
+    except BaseException:
+        sock.close()
+        raise
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _env_number(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def get_http_client(service):
+    """Return the process-wide client for a service in SERVICES"""
+    with _clients_lock:
+        client = _clients.get(service)
+        if client is None:
+            limits = SERVICES[service]
+            prefix = service.upper()
+            share = max(1.0, _env_number("HTTP_RATE_SHARE", 1))
+            client = _clients[service] = AsyncHttpClient(
+                requests_per_minute=_env_number(f"{prefix}_REQUESTS_PER_MINUTE", limits["requests_per_minute"]) / share,
+                max_concurrency=max(1, int(_env_number(f"{prefix}_MAX_CONCURRENCY", limits["max_concurrency"]) / share)),
+            )
+        return client
@@ -1,21 +1,31 @@
 import tkinter as tk
 import threading
-import tempfile
 import os
 from gui import TranscriptionGUI
+from gui_events import GuiEventQueue
 from audio_processor import AudioProcessor
 from transcription_engine import TranscriptionEngine
+from translation import Translator
+from result_cache import get_result_cache
 from file_operations import FileOperations
+from model_registry import preload_from_env
+from scheduler import QUEUED, get_job_scheduler
 
 class TranscriptionApp:
     def __init__(self, root):
         self.root = root
         self.gui = TranscriptionGUI(root)
         
-        # Initialize components
-        self.audio_processor = AudioProcessor(progress_callback=self.update_progress)
-        self.transcription_engine = TranscriptionEngine(progress_callback=self.update_progress)
+        # Worker threads post results and progress here; a Tk timer applies them
+        self.events = GuiEventQueue(root, on_rows=self.add_segments, on_progress=self.set_progress)
+        self.events.start()
+        
+        # Initialize components; each job gets its own audio processor and engine,
+        # sharing one translator so its in-memory cache lasts across jobs
         self.file_operations = FileOperations()
+        self.translator = Translator(cache=get_result_cache())
+        self.scheduler = get_job_scheduler()
+        self.current_job = None
         
         # Connect GUI methods to actual implementations
         self.gui.start_transcription = self.start_transcription
@@ -26,9 +36,11 @@ class TranscriptionApp:
         self.gui.progress_callback = self.update_progress
         
     def update_progress(self, message):
-        """Update progress in the GUI"""
-        if hasattr(self.gui, 'progress_var'):
-            self.gui.progress_var.set(message)
+        """Queue a progress message for the GUI (safe from any thread)"""
+        self.events.post_progress(message)
+    
+    def set_progress(self, message):
+        self.gui.progress_var.set(message)
     
     def start_transcription(self):
         """Start the transcription process"""
@@ -37,19 +49,26 @@ class TranscriptionApp:
             tk.messagebox.showerror("Error", "Please provide a video file or YouTube URL")
             return
         
-        # Set API key if provided
-        gemini_api_key = self.gui.api_key_var.get().strip()
-        self.transcription_engine.set_gemini_api_key(gemini_api_key)
-        self.file_operations.set_gemini_api_key(gemini_api_key)
-        
-        # Set translation option
-        self.transcription_engine.set_translate_option(self.gui.translate_var.get())
+        # Read every setting here, on the Tk thread; the job only sees this dict
+        try:
+            segment_length_sec = float(self.gui.segment_length.get())
+        except ValueError:
+            segment_length_sec = 15.0
+        settings = {
+            "gemini_api_key": self.gui.api_key_var.get().strip(),
+            "translate": self.gui.translate_var.get(),
+            "language": self.gui.language_var.get(),
+            "max_workers_english": self.gui.max_workers_english,
+            "max_workers_arabic": self.gui.max_workers_arabic,
+            "whisper_batch_size": self.gui.whisper_batch_size,
+            "segmentation": "vad" if self.gui.skip_silence_var.get() else "fixed",
+            "noise_gate": self.gui.noise_gate_var.get(),
+            "segment_length_sec": segment_length_sec,
+        }
+        self.file_operations.set_gemini_api_key(settings["gemini_api_key"])
         
-        # Clear previous results
-        for item in self.gui.tree.get_children():
-            self.gui.tree.delete(item)
-        self.gui.transcription_data = []
-        self.gui.current_text.delete(1.0, tk.END)
+        # Clear previous results; anything an earlier job still has queued is dropped
+        self.gui.clear_results()
         
         # Update UI state
         self.gui.is_transcribing = True
@@ -59,66 +78,85 @@ class TranscriptionApp:
         self.gui.progress_bar["value"] = 0
         self.gui.progress_var.set("Preparing...")
         
-        # Start transcription in a separate thread
-        thread = threading.Thread(target=self.transcription_worker, args=(input_path,))
-        thread.daemon = True
-        thread.start()
+        # Queue the job; its segments run on the scheduler's shared worker pool.
+        # Each job has its own cancellation token so a late Stop can't cancel the next one
+        self.current_job = self.scheduler.submit(
+            os.path.basename(input_path) or input_path,
+            lambda job: self.transcription_worker(input_path, settings, job),
+        )
+        # Events are drained on this thread, so none of the job's are lost before this
+        self.events.set_current(self.current_job)
+        if self.current_job.state == QUEUED:
+            self.gui.progress_var.set(f"Queued ({self.scheduler.queue_depth()} waiting)")
     
-    def transcription_worker(self, input_path):
-        """Worker thread for transcription"""
+    def make_engine(self, settings, progress):
+        engine = TranscriptionEngine(progress_callback=progress)
+        engine.translator = self.translator
+        engine.set_gemini_api_key(settings["gemini_api_key"])
+        engine.set_translate_option(settings["translate"])
+        engine.set_language(settings["language"])
+        engine.max_workers_english = settings["max_workers_english"]
+        engine.max_workers_arabic = settings["max_workers_arabic"]
+        engine.set_whisper_batch_size(settings["whisper_batch_size"])
+        engine.set_segmentation(settings["segmentation"])
+        engine.set_noise_gate(settings["noise_gate"])
+        return engine
+    
+    def transcription_worker(self, input_path, settings, job):
+        """Runs a transcription job on a scheduler job thread; never touches Tk"""
+        cancel = job.cancel_token
+        
+        def progress(message):
+            self.events.post_progress(message, job)
+        
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                is_youtube = self.audio_processor.is_youtube_url(input_path)
-                
-                if is_youtube:
-                    self.root.after(0, lambda: self.gui.progress_var.set("Downloading YouTube audio..."))
-                    audio_path, title = self.audio_processor.download_youtube_audio(input_path, tmpdir)
-                else:
-                    self.root.after(0, lambda: self.gui.progress_var.set("Extracting audio..."))
-                    language = self.gui.language_var.get()
-                    audio_path, title = self.audio_processor.extract_audio_from_local(input_path, tmpdir, language)
-                
-                if not audio_path or not self.gui.is_transcribing:
-                    return
-                
-                # Start transcription
-                self.root.after(0, lambda: self.gui.progress_var.set("Starting transcription..."))
-                
-                # Get segment length
-                try:
-                    segment_length_sec = float(self.gui.segment_length.get())
-                except ValueError:
-                    segment_length_sec = 15.0
-                
-                # Perform transcription
-                transcription_data = self.transcription_engine.transcribe_audio_segments(
-                    audio_path, 
-                    segment_length_sec, 
-                    self.gui.is_transcribing
-                )
-                
-                # Update GUI with results
-                if transcription_data:
-                    self.gui.transcription_data = transcription_data
-                    for segment in transcription_data:
-                        self.root.after(0, lambda s=segment: (
-                            self.gui.add_to_tree(s),
-                            self.gui.update_current_display(s['english'], s['arabic'])
-                        ))
-                
+            audio_processor = AudioProcessor(progress_callback=progress)
+            if audio_processor.is_youtube_url(input_path):
+                # Transcribe while yt-dlp is still downloading
+                progress("Streaming YouTube audio...")
+                audio_path, title = audio_processor.open_youtube_stream(input_path, cancel)
+            else:
+                audio_path, title = audio_processor.open_local_file(input_path)
+            
+            if not audio_path or cancel.cancelled:
+                return
+            
+            progress("Starting transcription...")
+            
+            # Perform transcription, showing each segment as soon as it is ready
+            self.make_engine(settings, progress).transcribe_audio_segments(
+                audio_path, 
+                settings["segment_length_sec"], 
+                cancel,
+                segment_callback=lambda segment: self.events.post_row(segment, job),
+                job=job
+            )
+            
         except Exception as e:
-            self.root.after(0, lambda: tk.messagebox.showerror("Error", f"Transcription failed: {e}"))
+            message = f"Transcription failed: {e}"
+            self.events.call(lambda: tk.messagebox.showerror("Error", message))
         finally:
-            self.root.after(0, self.transcription_finished)
+            self.events.call(lambda: self.transcription_finished(job))
+    
+    def add_segments(self, segments):
+        """Show a batch of the current job's segments from the event queue"""
+        self.gui.add_rows(segments)
+        job = self.current_job
+        if job is not None and job.total:
+            self.gui.progress_bar["value"] = min(100, 100 * len(self.gui.transcription_data) / job.total)
     
-    def transcription_finished(self):
-        """Called when transcription is finished"""
-        self.gui.transcription_finished()
+    def transcription_finished(self, job):
+        """Called on the Tk thread when a job's worker returns"""
+        if job is self.current_job:
+            self.gui.transcription_finished()
     
     def stop_transcription(self):
         """Stop the transcription process"""
         self.gui.is_transcribing = False
         self.gui.progress_var.set("Stopping...")
+        if self.current_job:
+            # Kills ffmpeg/yt-dlp, drops queued segments and releases the workers
+            self.current_job.cancel()
     
     def save_results(self):
         """Save transcription results"""
@@ -126,13 +164,42 @@ class TranscriptionApp:
             tk.messagebox.showwarning("Warning", "No transcription data to save")
             return
         
-        # Use file operations to save results
-        success = self.file_operations.save_results(self.gui.transcription_data, self.root)
-        if success:
-            # Update the save button state
+        base_name = self.file_operations.ask_save_path()
+        if not base_name:
+            return
+        
+        # Arabic correction and writing run off the Tk thread
+        data = self.gui.transcription_data
+        self.gui.save_button.config(state=tk.DISABLED)
+        self.update_progress("Saving results...")
+        threading.Thread(target=self.save_worker, args=(data, base_name), daemon=True).start()
+    
+    def save_worker(self, data, base_name):
+        try:
+            written = self.file_operations.write_results(data, base_name, progress_callback=self.update_progress)
+        except Exception as e:
+            message = f"Failed to save results: {e}"
+            self.events.call(lambda: self.save_finished(data, None, message))
+        else:
+            self.events.call(lambda: self.save_finished(data, written, None))
+    
+    def save_finished(self, data, written, error):
+        """Called on the Tk thread when a save is done"""
+        if not self.gui.is_transcribing:
             self.gui.save_button.config(state=tk.NORMAL)
+        if data is self.gui.transcription_data:
+            # Show any corrected Arabic text
+            self.gui.transcript_view.refresh()
+        if error:
+            self.gui.progress_var.set("Save failed")
+            tk.messagebox.showerror("Error", error)
+        else:
+            self.gui.progress_var.set("Results saved")
+            tk.messagebox.showinfo("Success", "Results saved to:\n" + "".join(f"• {path}\n" for path in written))
 
 def main():
+    # Start loading the models listed in WHISPER_PRELOAD while the UI comes up
+    preload_from_env()
     root = tk.Tk()
     app = TranscriptionApp(root)
     root.mainloop()
@@ -0,0 +1,234 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Approximate parameter counts of the Whisper sizes; faster-whisper keeps
+# its weights inside CTranslate2 where Python can't count them
+WHISPER_PARAMS = {
+    "tiny": 39e6, "base": 74e6, "small": 244e6, "medium": 769e6, "large": 1550e6, "turbo": 809e6,
+}
+# Bytes per weight for each CTranslate2 compute type
+COMPUTE_TYPE_BYTES = {"int8": 1, "int8_float16": 1, "int8_float32": 1, "float16": 2, "float32": 4}
+
+
+def _default_device():
+    """Pick CUDA when available, otherwise CPU"""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def _load_whisper_model(model_size, device):
+    """Load a Whisper model from disk"""
+    import whisper
+    return whisper.load_model(model_size, device=device)
+
+
+def _faster_whisper_compute_type(device):
+    return "int8_float16" if device == "cuda" else "int8"
+
+
+def _load_faster_whisper_model(model_size, device):
+    """Load an int8-quantized CTranslate2 Whisper model"""
+    from faster_whisper import WhisperModel
+    return WhisperModel(model_size, device=device, compute_type=_faster_whisper_compute_type(device))
+
+
+def estimate_model_bytes(model):
+    """Estimate the resident size of a model from its parameters and buffers"""
+    try:
+        total = sum(p.numel() * p.element_size() for p in model.parameters())
+        total += sum(b.numel() * b.element_size() for b in model.buffers())
+        return total
+    except Exception:
+        return 0
+
+
+def directory_bytes(path):
+    """Total size of the files under path (symlinks followed, as in the Hugging Face cache)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _whisper_params(model_size):
+    """Parameter count for a Whisper size name such as "medium.en" or "large-v3"; None if unknown"""
+    name = model_size.lower()
+    if "turbo" in name:
+        return WHISPER_PARAMS["turbo"]
+    if name.startswith("distil"):
+        return None
+    return WHISPER_PARAMS.get(name.split(".")[0].split("-")[0])
+
+
+def _estimate_whisper_bytes(model, model_size, device):
+    return estimate_model_bytes(model)
+
+
+def _estimate_faster_whisper_bytes(model, model_size, device):
+    """Parameters times the compute type's weight width, or the model's size on disk"""
+    params = _whisper_params(model_size)
+    if params is not None:
+        return int(params * COMPUTE_TYPE_BYTES[_faster_whisper_compute_type(device)])
+    # A custom model: a local directory, or a Hugging Face repo already downloaded by the load
+    path = model_size
+    if not os.path.isdir(path):
+        try:
+            from faster_whisper.utils import download_model
+            path = download_model(model_size, local_files_only=True)
+        except Exception:
+            return 0
+    return directory_bytes(path)
+
+
+# Model loaders and size estimates per recognizer engine
+LOADERS = {
+    "whisper": _load_whisper_model,
+    "faster-whisper": _load_faster_whisper_model,
+}
+ESTIMATORS = {
+    "whisper": _estimate_whisper_bytes,
+    "faster-whisper": _estimate_faster_whisper_bytes,
+}
+
+
+class ModelRegistry:
+    """Keeps loaded models resident and shares them across transcription jobs.
+
+    Models of every engine (see LOADERS) are keyed by (engine, model size,
+    device) and loaded at most once. When a memory budget is set, the least
+    recently used models are evicted to make room for a new one, whichever
+    engine they belong to; the model being requested is never evicted.
+    """
+
+    def __init__(self, memory_budget_mb=None, loaders=None, estimators=None):
+        self.memory_budget_mb = memory_budget_mb
+        self._loaders = loaders or LOADERS
+        self._estimators = estimators or ESTIMATORS
+        self._models = OrderedDict()  # (engine, size, device) -> (model, bytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, model_size="medium", device=None, engine="whisper"):
+        """Return a loaded model, loading it on first use"""
+        key = (engine, model_size, device or _default_device())
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+
+        # Serialize loads of the same model so concurrent jobs share one copy
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+
+            model = self._loaders[engine](*key[1:])
+            size = self._estimators[engine](model, *key[1:])
+
+            with self._lock:
+                self._models[key] = (model, size)
+                self._evict(keep=key)
+            return model
+
+    def _evict(self, keep):
+        if not self.memory_budget_mb:
+            return
+        budget = self.memory_budget_mb * 1024 * 1024
+        for key in list(self._models):
+            if self.memory_bytes() <= budget:
+                break
+            if key != keep:
+                del self._models[key]
+
+    def memory_bytes(self):
+        """Estimated memory held by all cached models"""
+        return sum(size for _, size in self._models.values())
+
+    def cached_keys(self):
+        """Cached (engine, model size, device) keys, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def evict(self, model_size, device=None, engine="whisper"):
+        """Drop a model from the cache"""
+        with self._lock:
+            self._models.pop((engine, model_size, device or _default_device()), None)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def preload(self, models, device=None, background=True, on_error=None):
+        """Load models ahead of the first job, optionally in a daemon thread.
+
+        models are sizes of Whisper models or (engine, size) pairs.
+        """
+        models = [(model if isinstance(model, tuple) else ("whisper", model)) for model in models]
+
+        def worker():
+            for engine, size in models:
+                try:
+                    self.get(size, device, engine)
+                except Exception as e:
+                    if on_error:
+                        on_error(size, e)
+                    else:
+                        print(f"Failed to preload {engine} model '{size}': {e}")
+
+        if not background:
+            worker()
+            return None
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Return the process-wide model registry shared by every recognizer engine.
+
+    The memory budget can be set with WHISPER_CACHE_BUDGET_MB (0 or unset
+    means unbounded) and covers the models of all engines together.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            try:
+                budget = int(os.environ.get("WHISPER_CACHE_BUDGET_MB", "0")) or None
+            except ValueError:
+                budget = None
+            _registry = ModelRegistry(memory_budget_mb=budget)
+        return _registry
+
+
+def preload_from_env(on_error=None):
+    """Preload the models listed in WHISPER_PRELOAD.
+
+    Comma separated Whisper sizes, or engine:size for another engine,
+    e.g. "medium,faster-whisper:small".
+    """
+    models = []
+    for entry in os.environ.get("WHISPER_PRELOAD", "").split(","):
+        engine, _, size = entry.strip().rpartition(":")
+        if size:
+            models.append((engine or "whisper", size))
+    if not models:
+        return None
+    return get_model_registry().preload(models, on_error=on_error)
@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Per-process state of pool workers: recognizers by spec
+_worker_recognizers = {}
+
+
+def _attach_shared_memory(name):
+    """Open an existing shared memory block without registering it for cleanup.
+
+    The parent owns and unlinks every block; letting the worker's resource
+    tracker register it too would unlink it early or warn on shutdown.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _init_worker(torch_threads, workers=1):
+    # The pool's workers share each API quota (see http_client.get_http_client)
+    os.environ["HTTP_RATE_SHARE"] = str(workers)
+    if torch_threads:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except Exception:
+            pass
+
+
+def _get_worker_recognizer(spec):
+    name, language, options = spec
+    key = (name, language, tuple(sorted(options.items())))
+    recognizer = _worker_recognizers.get(key)
+    if recognizer is None:
+        from recognizers import create_recognizer
+        recognizer = _worker_recognizers[key] = create_recognizer(name, language, **options)
+    return recognizer
+
+
+def _warm_worker(spec):
+    _get_worker_recognizer(spec).load()
+    return os.getpid()
+
+
+def _run_shared(spec, shm_name, layout):
+    """Worker entry point: read chunks from shared memory and recognize them"""
+    shm = _attach_shared_memory(shm_name)
+    total = sum(length for _, length in layout)
+    buffer = np.ndarray((total,), dtype=np.float32, buffer=shm.buf)
+    chunks = [buffer[offset:offset + length] for offset, length in layout]
+    try:
+        return _get_worker_recognizer(spec).transcribe_batch(chunks)
+    finally:
+        del chunks, buffer
+        try:
+            shm.close()
+        except BufferError:
+            pass
+
+
+def share_chunks(views):
+    """Copy chunk buffers into one shared memory block.
+
+    Returns the block and a list of (offset, length) pairs locating each
+    chunk inside it.
+    """
+    total = sum(len(v) for v in views)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total * 4))
+    buffer = np.ndarray((total,), dtype=np.float32, buffer=shm.buf)
+    layout = []
+    offset = 0
+    for view in views:
+        buffer[offset:offset + len(view)] = view
+        layout.append((offset, len(view)))
+        offset += len(view)
+    del buffer
+    return shm, layout
+
+
+def _release(shm):
+    try:
+        shm.close()
+        shm.unlink()
+    except Exception:
+        pass
+
+
+class ProcessBackend:
+    """Process pool where every worker holds its own recognizer models.
+
+    Chunk samples are handed to workers through shared memory and only the
+    recognized text comes back, so CPU-bound decoding runs on all cores
+    instead of contending for the GIL.
+    """
+
+    def __init__(self, workers=None, torch_threads=None):
+        cpu_count = os.cpu_count() or 1
+        self.workers = max(1, workers or cpu_count)
+        if torch_threads is None:
+            torch_threads = max(1, cpu_count // self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(torch_threads, self.workers),
+        )
+
+    def submit(self, spec, views):
+        """Recognize chunks with the recognizer described by spec (see Recognizer.spec).
+
+        The future resolves to one text (or None) per chunk.
+        """
+        shm, layout = share_chunks(views)
+        try:
+            future = self._executor.submit(_run_shared, spec, shm.name, layout)
+        except Exception:
+            _release(shm)
+            raise
+        future.add_done_callback(lambda _: _release(shm))
+        return future
+
+    def warm(self, spec):
+        """Load the recognizer's model in every worker ahead of the first job"""
+        futures = [self._executor.submit(_warm_worker, spec) for _ in range(self.workers)]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_process_backend(workers=None):
+    """Return a shared process backend so worker models stay loaded across jobs"""
+    with _backends_lock:
+        backend = _backends.get(workers)
+        if backend is None:
+            backend = _backends[workers] = ProcessBackend(workers)
+        return backend
+
+
+def shutdown_process_backends():
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.shutdown(wait=False)
+        _backends.clear()
@@ -0,0 +1,263 @@
+import os
+import re
+import json
+from urllib.parse import urlencode
+
+from audio_buffer import to_audio_data
+from model_registry import get_model_registry
+from whisper_batch import ARABIC_PROMPT, can_batch, decode_batch
+
+# Registered recognizer classes by name
+RECOGNIZERS = {}
+
+# Recognizer used for each language unless the engine is told otherwise
+DEFAULT_RECOGNIZERS = {"en-US": "google", "ar-AR": "whisper"}
+
+# Google Web Speech API v2
+GOOGLE_SPEECH_ENDPOINT = "http://www.google.com/speech-api/v2/recognize"
+# Google API keys are "AIza" and 35 more characters
+GOOGLE_KEY_PATTERN = re.compile(r"[\"'](AIza[0-9A-Za-z_\-]{35})[\"']")
+
+
+class RecognitionError(Exception):
+    """The recognizer failed, as opposed to finding no speech"""
+
+
+_library_google_key = None
+
+
+def google_speech_key():
+    """API key for the Google Web Speech API.
+
+    GOOGLE_SPEECH_KEY when set, otherwise the key SpeechRecognition's
+    recognize_google falls back to, read from the installed library so an
+    upstream key rotation only needs a library upgrade.
+    """
+    global _library_google_key
+    key = os.environ.get("GOOGLE_SPEECH_KEY")
+    if key:
+        return key
+    if _library_google_key is None:
+        import inspect
+        import speech_recognition as sr
+        function = sr.Recognizer.recognize_google
+        default = inspect.signature(function).parameters.get("key")
+        if default is not None and isinstance(default.default, str):
+            _library_google_key = default.default
+        else:
+            # The default is None and the key is a literal in the library's source
+            try:
+                with open(inspect.getsourcefile(function), encoding="utf-8") as f:
+                    match = GOOGLE_KEY_PATTERN.search(f.read())
+            except (OSError, TypeError):
+                match = None
+            if match is None:
+                raise RecognitionError("No Google speech API key found; set GOOGLE_SPEECH_KEY")
+            _library_google_key = match.group(1)
+    return _library_google_key
+
+
+def register_recognizer(name):
+    """Class decorator adding a recognizer to the registry under name"""
+    def decorator(cls):
+        cls.name = name
+        RECOGNIZERS[name] = cls
+        return cls
+    return decorator
+
+
+def available_recognizers():
+    return sorted(RECOGNIZERS)
+
+
+def create_recognizer(name, language, **options):
+    cls = RECOGNIZERS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown recognizer: {name}")
+    return cls(language, **options)
+
+
+def _short_language(language):
+    """Whisper takes bare language codes ("ar" for "ar-AR")"""
+    return language.split("-")[0]
+
+
+class Recognizer:
+    """Turns batches of 16 kHz mono float32 sample buffers into text.
+
+    transcribe_batch returns one entry per buffer: the recognized text, or
+    None when no speech was found. Failures raise RecognitionError.
+    Recognizers take their options as keyword arguments, so spec() is
+    enough to rebuild one in a worker process.
+    """
+
+    name = None
+    # Cap on threads sharing one instance; models that serialize on a
+    # single forward pass gain nothing from more
+    max_threads = None
+
+    def __init__(self, language, **options):
+        self.language = language
+        self.options = options
+
+    @property
+    def max_batch(self):
+        """Most chunks worth passing to a single transcribe_batch call"""
+        return 1
+
+    def can_batch(self, samples):
+        return True
+
+    def spec(self):
+        """(name, language, options) for create_recognizer"""
+        return self.name, self.language, dict(self.options)
+
+    def settings(self):
+        """Everything besides the audio that determines the output, for cache keys"""
+        return {"recognizer": self.name, "language": self.language, **self.options}
+
+    def load(self):
+        """Load models ahead of the first batch"""
+
+    def transcribe_batch(self, chunks):
+        raise NotImplementedError
+
+
+def parse_google_response(text):
+    """Best transcript from a Web Speech API reply (one JSON object per line); None for no speech"""
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        results = json.loads(line).get("result") or []
+        if not results:
+            continue
+        alternatives = results[0].get("alternative") or []
+        if not alternatives:
+            return None
+        best = max(alternatives, key=lambda alternative: alternative.get("confidence", 0))
+        return best.get("transcript") or None
+    return None
+
+
+@register_recognizer("google")
+class GoogleRecognizer(Recognizer):
+    """Google Web Speech API, one request per chunk.
+
+    Requests go through the shared "speech" HTTP client, which keeps
+    connections alive, holds every worker to one rate limit and retries
+    throttled or failed requests with backoff. GOOGLE_SPEECH_ENDPOINT
+    points it at another server, e.g. a local mock, and GOOGLE_SPEECH_KEY
+    sets the API key (see google_speech_key).
+    """
+
+    def transcribe_batch(self, chunks):
+        from http_client import get_http_client
+
+        url = os.environ.get("GOOGLE_SPEECH_ENDPOINT", GOOGLE_SPEECH_ENDPOINT) + "?" + urlencode(
+            {"client": "chromium", "lang": self.language, "key": google_speech_key(), "pFilter": 0}
+        )
+        client = get_http_client("speech")
+        futures = []
+        for chunk in chunks:
+            audio = to_audio_data(chunk)
+            # Only the public AudioData API, so any SpeechRecognition release works
+            body = audio.get_flac_data(convert_width=2)
+            headers = {"Content-Type": f"audio/x-flac; rate={audio.sample_rate}"}
+            futures.append(client.submit("POST", url, body, headers))
+
+        texts = []
+        for future in futures:
+            try:
+                response = future.result()
+            except Exception as e:
+                raise RecognitionError(f"API Error: recognition connection failed: {e}") from e
+            if not response.ok:
+                raise RecognitionError(f"API Error: recognition request failed: {response.status} {response.reason}")
+            try:
+                texts.append(parse_google_response(response.text()))
+            except (ValueError, AttributeError):
+                texts.append(None)
+        return texts
+
+
+@register_recognizer("whisper")
+class WhisperRecognizer(Recognizer):
+    """OpenAI Whisper; batch_size above 1 decodes that many chunks per forward pass"""
+
+    max_threads = 1
+
+    def __init__(self, language, model_size="medium", device=None, batch_size=1):
+        super().__init__(language, model_size=model_size, device=device, batch_size=max(1, int(batch_size)))
+        self.prompt = ARABIC_PROMPT if language == "ar-AR" else None
+
+    @property
+    def max_batch(self):
+        return self.options["batch_size"]
+
+    def can_batch(self, samples):
+        return can_batch(samples)
+
+    def settings(self):
+        return {"recognizer": self.name, "model": self.options["model_size"],
+                "language": _short_language(self.language), "prompt": self.prompt,
+                "batched": self.max_batch > 1}
+
+    def load(self):
+        return get_model_registry().get(self.options["model_size"], self.options["device"], "whisper")
+
+    def transcribe_batch(self, chunks):
+        language = _short_language(self.language)
+        try:
+            model = self.load()
+            if len(chunks) > 1:
+                texts = decode_batch(model, chunks, language, self.prompt)
+            else:
+                texts = [
+                    model.transcribe(chunk, language=language, task="transcribe", initial_prompt=self.prompt)
+                    .get("text", "").strip()
+                    for chunk in chunks
+                ]
+        except Exception as e:
+            raise RecognitionError(f"Recognition Error: {e}") from e
+        return [text or None for text in texts]
+
+
+@register_recognizer("faster-whisper")
+class FasterWhisperRecognizer(Recognizer):
+    """Whisper on CTranslate2 with int8 weights (faster-whisper).
+
+    Several times faster than the reference implementation on CPU at a
+    small accuracy cost, and the model takes about a quarter of the memory.
+    """
+
+    max_threads = 1
+
+    def __init__(self, language, model_size="medium", device=None, beam_size=5):
+        super().__init__(language, model_size=model_size, device=device, beam_size=beam_size)
+        self.prompt = ARABIC_PROMPT if language == "ar-AR" else None
+
+    def settings(self):
+        return {"recognizer": self.name, "model": self.options["model_size"],
+                "language": _short_language(self.language), "prompt": self.prompt,
+                "beam_size": self.options["beam_size"]}
+
+    def load(self):
+        return get_model_registry().get(self.options["model_size"], self.options["device"], "faster-whisper")
+
+    def transcribe_batch(self, chunks):
+        language = _short_language(self.language)
+        texts = []
+        try:
+            model = self.load()
+            for chunk in chunks:
+                segments, _ = model.transcribe(
+                    chunk,
+                    language=language,
+                    task="transcribe",
+                    initial_prompt=self.prompt,
+                    beam_size=self.options["beam_size"],
+                )
+                texts.append(" ".join(segment.text.strip() for segment in segments).strip() or None)
+        except Exception as e:
+            raise RecognitionError(f"Recognition Error: {e}") from e
+        return texts
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video-transcription")
+DEFAULT_MAX_MB = 512
+
+
+def make_key(*parts):
+    """Stable hash of arbitrary JSON-serializable key parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path, block_size=1024 * 1024):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def samples_digest(samples):
+    """SHA-256 of a sample buffer"""
+    return hashlib.sha256(memoryview(samples).cast("B")).hexdigest()
+
+
+class ResultCache:
+    """On-disk key/value store for transcription results with LRU size eviction.
+
+    Values are JSON documents stored in a single SQLite file. When the
+    total stored size exceeds max_bytes, the least recently read or written
+    entries are removed.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        path = path or os.path.join(DEFAULT_CACHE_DIR, "results.sqlite3")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._warned = False
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key):
+        """Stored value for key; None on a miss or when the database can't be read"""
+        row = None
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+            except sqlite3.Error as e:
+                # Locked, corrupt or unwritable: carry on as if nothing was cached
+                self._failed("read", e)
+                if row is None:
+                    return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, key, value):
+        """Store value under key; a database error only loses the entry"""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        with self._lock:
+            total = self._total
+            try:
+                row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._total -= row[0]
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, data, size, time.time()),
+                )
+                self._total += size
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._total = total
+                try:
+                    self._db.rollback()
+                except sqlite3.Error:
+                    pass
+                self._failed("write", e)
+
+    def _failed(self, action, error):
+        if not self._warned:
+            self._warned = True
+            print(f"Result cache {action} failed, continuing without it: {error}")
+
+    def _evict(self):
+        if not self.max_bytes or self._total <= self.max_bytes:
+            return
+        # Trim to 90% so eviction doesn't run on every put once full
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self._total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._total -= size
+
+    def size_bytes(self):
+        return self._total
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+            self._total = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide result cache, or None when disabled.
+
+    Configured with TRANSCRIPTION_CACHE (set to 0 to disable),
+    TRANSCRIPTION_CACHE_DIR and TRANSCRIPTION_CACHE_MAX_MB.
+    """
+    global _cache
+    if os.environ.get("TRANSCRIPTION_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            directory = os.environ.get("TRANSCRIPTION_CACHE_DIR", DEFAULT_CACHE_DIR)
+            try:
+                max_mb = float(os.environ.get("TRANSCRIPTION_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            except ValueError:
+                max_mb = DEFAULT_MAX_MB
+            try:
+                _cache = ResultCache(os.path.join(directory, "results.sqlite3"), int(max_mb * 1024 * 1024))
+            except (OSError, sqlite3.Error) as e:
+                print(f"Result cache disabled: {e}")
+                return None
+        return _cache
@@ -0,0 +1,280 @@
+import os
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+
+from cancellation import CancellationToken
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job(Executor):
+    """One job in a JobScheduler, and the executor its segment tasks run on.
+
+    submit() queues a task on the scheduler's shared worker pool, so the
+    transcription engine can use a job wherever it would use its own
+    ThreadPoolExecutor. shutdown() drops the job's queued tasks and
+    optionally waits for its running ones; the shared pool stays up.
+    """
+
+    def __init__(self, scheduler, job_id, name, run, priority):
+        self.id = job_id
+        self.name = name
+        self.priority = priority
+        self.state = QUEUED
+        self.cancel_token = CancellationToken()
+        self.future = Future()
+        self.max_concurrency = None
+        self.completed = 0
+        self.total = None
+        self.message = ""
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._scheduler = scheduler
+        self._run = run
+        self._tasks = deque()
+        self._running = 0
+        self._served = 0
+
+    def submit(self, fn, *args, **kwargs):
+        return self._scheduler._submit_task(self, fn, args, kwargs)
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._scheduler._drain(self, wait, cancel_futures)
+
+    def set_concurrency(self, limit):
+        """Most segment tasks of this job allowed to run at once (None for no limit)"""
+        with self._scheduler._cond:
+            self.max_concurrency = limit
+            self._scheduler._cond.notify_all()
+
+    def set_progress(self, completed=None, total=None, message=None):
+        if completed is not None:
+            self.completed = completed
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """Cancel a queued job, or stop a running one through its cancellation token"""
+        self._scheduler._cancel_job(self)
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def snapshot(self):
+        """Current state and progress as a plain dict"""
+        end = self.finished_at or time.monotonic()
+        return {
+            "id": self.id,
+            "name": self.name,
+            "priority": self.priority,
+            "state": self.state,
+            "completed": self.completed,
+            "total": self.total,
+            "message": self.message,
+            "queued_tasks": len(self._tasks),
+            "running_tasks": self._running,
+            "elapsed": end - self.started_at if self.started_at else 0.0,
+        }
+
+
+class JobScheduler:
+    """Runs transcription jobs on one shared pool of segment workers.
+
+    Jobs wait in a priority queue (higher first, FIFO within a priority)
+    until one of max_running_jobs slots is free, then run(job) is called
+    on a thread of its own. Segment tasks that running jobs submit all
+    share the same `workers` threads: a free worker takes the next task
+    from the highest-priority job, and among equal priorities from the job
+    with the fewest tasks running, so concurrent jobs split capacity evenly
+    instead of each bringing its own thread pool.
+    """
+
+    def __init__(self, workers=None, max_running_jobs=1):
+        self.workers = max(1, workers or max(4, os.cpu_count() or 4))
+        self.max_running_jobs = max(1, max_running_jobs)
+        self._cond = threading.Condition()
+        self._queue = []            # heap of (-priority, sequence, job)
+        self._running = []
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._busy = 0
+        self._closed = False
+        self._threads = []
+
+    def submit(self, name, run, priority=0):
+        """Queue a job; run(job) is called when it starts. Returns the Job"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            job = Job(self, next(self._ids), name, run, priority)
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (-priority, job.id, job))
+            self._start_jobs()
+        return job
+
+    def queue_depth(self):
+        """Jobs waiting for a slot"""
+        with self._cond:
+            return len(self._queue)
+
+    def jobs(self):
+        with self._cond:
+            return list(self._jobs.values())
+
+    def status(self):
+        """Queue depth, worker use and per-job progress"""
+        with self._cond:
+            return {
+                "queued_jobs": len(self._queue),
+                "running_jobs": len(self._running),
+                "queued_tasks": sum(len(job._tasks) for job in self._running),
+                "busy_workers": self._busy,
+                "workers": self.workers,
+                "jobs": [job.snapshot() for job in self._jobs.values()],
+            }
+
+    def forget_finished(self):
+        """Drop finished jobs from status()"""
+        with self._cond:
+            self._jobs = {i: j for i, j in self._jobs.items() if j.state in (QUEUED, RUNNING)}
+
+    def shutdown(self, cancel=True, wait=True):
+        with self._cond:
+            self._closed = True
+            jobs = list(self._jobs.values())
+        if cancel:
+            for job in jobs:
+                job.cancel()
+        with self._cond:
+            if wait:
+                while self._running:
+                    self._cond.wait()
+            self._cond.notify_all()
+
+    # Job slots
+
+    def _start_jobs(self):
+        while self._queue and len(self._running) < self.max_running_jobs:
+            _, _, job = heapq.heappop(self._queue)
+            job.state = RUNNING
+            job.started_at = time.monotonic()
+            self._running.append(job)
+            threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.id}", daemon=True).start()
+
+    def _run_job(self, job):
+        try:
+            result = job._run(job)
+        except BaseException as e:
+            job.state = CANCELLED if job.cancel_token.cancelled else FAILED
+            job.future.set_exception(e)
+        else:
+            job.state = CANCELLED if job.cancel_token.cancelled else DONE
+            job.future.set_result(result)
+        finally:
+            job.finished_at = time.monotonic()
+            self._drain(job, wait=False, cancel_futures=True)
+            with self._cond:
+                self._running.remove(job)
+                if not self._closed:
+                    self._start_jobs()
+                self._cond.notify_all()
+
+    def _cancel_job(self, job):
+        with self._cond:
+            queued = job.state == QUEUED
+            if queued:
+                self._queue = [entry for entry in self._queue if entry[2] is not job]
+                heapq.heapify(self._queue)
+                job.state = CANCELLED
+                job.finished_at = time.monotonic()
+        job.cancel_token.cancel()
+        if queued:
+            job.future.cancel()
+        else:
+            self._drain(job, wait=False, cancel_futures=True)
+
+    # Segment tasks
+
+    def _submit_task(self, job, fn, args, kwargs):
+        future = Future()
+        with self._cond:
+            if job.state != RUNNING:
+                raise RuntimeError(f"Job {job.id} is not running")
+            job._tasks.append((future, fn, args, kwargs))
+            self._ensure_workers()
+            self._cond.notify()
+        return future
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"segment-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        candidates = [
+            job for job in self._running
+            if job._tasks and (job.max_concurrency is None or job._running < job.max_concurrency)
+        ]
+        if not candidates:
+            return None, None
+        job = min(candidates, key=lambda j: (-j.priority, j._running, j._served, j.id))
+        job._running += 1
+        job._served += 1
+        return job, job._tasks.popleft()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job, task = self._next_task()
+                while task is None:
+                    if self._closed and not self._running:
+                        return
+                    self._cond.wait()
+                    job, task = self._next_task()
+                self._busy += 1
+            future, fn, args, kwargs = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    job._running -= 1
+                    self._cond.notify_all()
+
+    def _drain(self, job, wait, cancel_futures):
+        with self._cond:
+            if cancel_futures:
+                while job._tasks:
+                    job._tasks.popleft()[0].cancel()
+            if wait:
+                while job._running or job._tasks:
+                    self._cond.wait()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler():
+    """Return the process-wide scheduler used by the GUI"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
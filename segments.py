@@ -0,0 +1,164 @@
+import sys
+from array import array
+from bisect import bisect_right
+
+# Texts up to this long (markers like "[No speech]", short replies) are
+# interned so repeats share one string
+INTERN_MAX_LENGTH = 40
+
+# Width of the time buckets behind SegmentStore.index_at
+BUCKET_MS = 10000
+
+
+def format_timestamp(ms):
+    """ "HH:MM:SS" for a time in milliseconds"""
+    hours, remainder = divmod(int(ms) // 1000, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def parse_timestamp(text):
+    """Seconds from "HH:MM:SS", "MM:SS" or plain seconds; None if it can't be read"""
+    try:
+        seconds = 0.0
+        for part in text.strip().split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except (AttributeError, ValueError):
+        return None
+
+
+def _intern(text):
+    if not text:
+        return ""
+    return sys.intern(text) if len(text) <= INTERN_MAX_LENGTH else text
+
+
+class Segment:
+    """One transcribed segment: start and end in milliseconds and its two texts"""
+
+    __slots__ = ("start_ms", "end_ms", "english", "arabic")
+
+    def __init__(self, start_ms, end_ms, english="", arabic=""):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.english = english
+        self.arabic = arabic
+
+    @property
+    def timestamp(self):
+        return format_timestamp(self.start_ms)
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp, 'english': self.english, 'arabic': self.arabic,
+            'start_ms': self.start_ms, 'end_ms': self.end_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """From to_dict() output or an older {'timestamp', 'english', 'arabic'} dict.
+
+        end_ms is None when the dict has no end time.
+        """
+        start_ms = data.get('start_ms')
+        if start_ms is None:
+            start_ms = int((parse_timestamp(data.get('timestamp', "")) or 0) * 1000)
+        return cls(start_ms, data.get('end_ms'), data.get('english') or "", data.get('arabic') or "")
+
+    def __repr__(self):
+        return f"Segment({self.start_ms}, {self.end_ms}, {self.english!r}, {self.arabic!r})"
+
+
+class SegmentStore:
+    """A transcript as columns: start/end times in integer arrays, texts in lists.
+
+    Costs a few dozen bytes per segment on top of the texts themselves,
+    against several hundred for a dict with a timestamp string. Indexing
+    returns a Segment built on the fly, so changing one doesn't change
+    the store; use set_text() for that. Segments must be added in start
+    time order. index_at() finds the segment playing at a time in constant
+    time through a table of the first segment in each 10-second bucket.
+    """
+
+    def __init__(self, segments=()):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.english = []
+        self.arabic = []
+        # Index of the last segment starting at or before each bucket boundary
+        self._buckets = array('l')
+        self.extend(segments)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return Segment(self.starts[index], self.ends[index], self.english[index], self.arabic[index])
+
+    def __iter__(self):
+        return map(Segment, self.starts, self.ends, self.english, self.arabic)
+
+    def append(self, segment):
+        self.add(segment.start_ms, segment.end_ms, segment.english, segment.arabic)
+
+    def extend(self, segments):
+        for segment in segments:
+            self.add(segment.start_ms, segment.end_ms, segment.english, segment.arabic)
+
+    def add(self, start_ms, end_ms, english="", arabic=""):
+        index = len(self.starts)
+        if index and start_ms < self.starts[-1]:
+            raise ValueError("segments must be added in start time order")
+        if end_ms is None:
+            end_ms = start_ms
+        self.starts.append(start_ms)
+        self.ends.append(end_ms)
+        self.english.append(_intern(english))
+        self.arabic.append(_intern(arabic))
+        buckets = self._buckets
+        for bucket in range(len(buckets), start_ms // BUCKET_MS + 1):
+            buckets.append(index if start_ms <= bucket * BUCKET_MS else max(0, index - 1))
+
+    def set_text(self, index, english=None, arabic=None):
+        if english is not None:
+            self.english[index] = _intern(english)
+        if arabic is not None:
+            self.arabic[index] = _intern(arabic)
+
+    def clear(self):
+        del self.starts[:], self.ends[:], self.english[:], self.arabic[:], self._buckets[:]
+
+    def index_at(self, ms):
+        """Index of the segment playing at ms (the last one starting at or before it)"""
+        if not self.starts:
+            return None
+        buckets = self._buckets
+        bucket = max(0, int(ms) // BUCKET_MS)
+        if bucket + 1 < len(buckets):
+            low, high = buckets[bucket], buckets[bucket + 1] + 1
+        else:
+            low, high = buckets[-1], len(self.starts)
+        return max(0, bisect_right(self.starts, ms, low, high) - 1)
+
+    def to_dicts(self):
+        return [segment.to_dict() for segment in self]
+
+    @classmethod
+    def from_dicts(cls, items):
+        """Store from dicts, e.g. a saved _complete.json.
+
+        Segments without an end time run to the next start; the last one
+        gets the same length as the one before it.
+        """
+        segments = sorted((Segment.from_dict(item) for item in items), key=lambda s: s.start_ms)
+        for segment, following in zip(segments, segments[1:]):
+            if segment.end_ms is None:
+                segment.end_ms = following.start_ms
+        if segments and segments[-1].end_ms is None:
+            last = segments[-1]
+            length = segments[-2].end_ms - segments[-2].start_ms if len(segments) > 1 else 0
+            last.end_ms = last.start_ms + length
+        return cls(segments)
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exporters import write_transcript
+from segments import Segment
+
+
+class SubtitleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmpdir.name, "talk")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read(self, suffix):
+        with open(self.base + suffix, encoding="utf-8") as f:
+            return f.read()
+
+    def test_arabic_only_transcript(self):
+        segments = [
+            Segment(0, 2000, "", "مرحبا بكم"),
+            Segment(2000, 4000, "", "[لا يوجد كلام]"),
+            Segment(4000, 6000, "", "- كيف حالك؟\n\n- بخير"),
+        ]
+        write_transcript(segments, self.base, ["srt", "vtt"])
+
+        self.assertEqual(self.read(".srt"),
+                         "1\n00:00:00,000 --> 00:00:02,000\nمرحبا بكم\n\n"
+                         "2\n00:00:04,000 --> 00:00:06,000\n- كيف حالك؟\n- بخير\n\n")
+        self.assertEqual(self.read(".vtt"),
+                         "WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nمرحبا بكم\n\n"
+                         "00:00:04.000 --> 00:00:06.000\n- كيف حالك؟\n- بخير\n\n")
+
+    def test_english_is_preferred_over_arabic(self):
+        segments = [
+            Segment(0, 2000, "Hello", "مرحبا"),
+            Segment(2000, 4000, "[Recognition Error: timeout]", "خطأ"),
+        ]
+        write_transcript(segments, self.base, ["srt"])
+
+        self.assertEqual(self.read(".srt"),
+                         "1\n00:00:00,000 --> 00:00:02,000\nHello\n\n"
+                         "2\n00:00:02,000 --> 00:00:04,000\nخطأ\n\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
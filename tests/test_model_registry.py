@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry
+from model_registry import ModelRegistry
+
+MB = 1024 * 1024
+
+
+class FakeEngines:
+    """Loaders that record each load and estimators that report a fixed size per engine"""
+
+    def __init__(self, sizes_mb):
+        self.loads = []
+        self.loaders = {engine: self.loader(engine) for engine in sizes_mb}
+        self.estimators = {engine: (lambda model, size, device, mb=mb: mb * MB) for engine, mb in sizes_mb.items()}
+
+    def loader(self, engine):
+        def load(model_size, device):
+            self.loads.append((engine, model_size))
+            return object()
+        return load
+
+
+class ModelRegistryTest(unittest.TestCase):
+    def test_one_budget_covers_every_engine(self):
+        engines = FakeEngines({"whisper": 600, "faster-whisper": 500})
+        registry = ModelRegistry(memory_budget_mb=1000, loaders=engines.loaders, estimators=engines.estimators)
+        registry.get("medium", "cpu")
+        registry.get("medium", "cpu", "faster-whisper")
+
+        self.assertEqual(registry.cached_keys(), [("faster-whisper", "medium", "cpu")])
+        self.assertLessEqual(registry.memory_bytes(), 1000 * MB)
+
+    def test_models_are_loaded_once(self):
+        engines = FakeEngines({"whisper": 1, "faster-whisper": 1})
+        registry = ModelRegistry(loaders=engines.loaders, estimators=engines.estimators)
+        for _ in range(3):
+            registry.get("small", "cpu")
+            registry.get("small", "cpu", "faster-whisper")
+        self.assertEqual(engines.loads, [("whisper", "small"), ("faster-whisper", "small")])
+
+    def test_preload_from_env_takes_engine_prefixes(self):
+        engines = FakeEngines({"whisper": 1, "faster-whisper": 1})
+        registry = ModelRegistry(loaders=engines.loaders, estimators=engines.estimators)
+        with mock.patch.object(model_registry, "_registry", registry), \
+                mock.patch.dict(os.environ, {"WHISPER_PRELOAD": "tiny, faster-whisper:small"}):
+            model_registry.preload_from_env().join()
+        self.assertEqual(engines.loads, [("whisper", "tiny"), ("faster-whisper", "small")])
+
+    def test_faster_whisper_size_from_parameters(self):
+        self.assertEqual(model_registry._estimate_faster_whisper_bytes(None, "medium.en", "cpu"), 769_000_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "results.sqlite3")
+        self.cache = ResultCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        self.cache.put("key", {"text": "hello"})
+        self.assertEqual(self.cache.get("key"), {"text": "hello"})
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_locked_database_is_a_miss(self):
+        self.cache.put("key", {"text": "hello"})
+        self.cache._db.execute("PRAGMA busy_timeout = 0")
+        other = sqlite3.connect(self.path, timeout=0)
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            with redirect_stdout(StringIO()):
+                self.assertIsNone(self.cache.get("key"))
+                self.cache.put("other", {"text": "lost"})
+        finally:
+            other.rollback()
+            other.close()
+        self.assertEqual(self.cache.get("key"), {"text": "hello"})
+        self.assertIsNone(self.cache.get("other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache
+from translation import ArabicCorrector, GeminiReply, Translator
+
+
+class FakeGemini:
+    """Stands in for GeminiClient: answers batch prompts with "<prefix><text>" per id.
+
+    Ids listed in `drop` are left out of batch replies, as a model sometimes does.
+    """
+
+    def __init__(self, prefix="T:", drop=()):
+        self.prefix = prefix
+        self.drop = set(drop)
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+        start = prompt.find("{")
+        if start == -1:
+            # A single-segment prompt: the text follows the instructions
+            return GeminiReply(self.prefix + prompt.rsplit("\n\n", 1)[1])
+        items = json.loads(prompt[start:])
+        reply = {key: self.prefix + text for key, text in items.items() if key not in self.drop}
+        return GeminiReply(f"```json\n{json.dumps(reply, ensure_ascii=False)}\n```")
+
+
+class TranslatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmpdir.name, "cache.sqlite3"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def translator(self, client):
+        return Translator("key", cache=self.cache, client_factory=lambda key, model: client,
+                          batch_size=20, max_delay=0.5)
+
+    def translate_concurrently(self, translator, texts):
+        results = [None] * len(texts)
+        barrier = threading.Barrier(len(texts))
+
+        def worker(i):
+            barrier.wait()
+            results[i] = translator.translate(texts[i], "ar")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_requests_are_batched_and_deduplicated(self):
+        client = FakeGemini()
+        texts = ["one", "two", "three", "two", "one", "four"]
+        results = self.translate_concurrently(self.translator(client), texts)
+
+        self.assertEqual(results, ["T:" + text for text in texts])
+        self.assertEqual(len(client.prompts), 1)
+        sent = json.loads(client.prompts[0][client.prompts[0].find("{"):])
+        self.assertEqual(sorted(sent.values()), ["four", "one", "three", "two"])
+
+    def test_memory_limit_under_concurrent_batches(self):
+        client = FakeGemini()
+        translator = Translator("key", client_factory=lambda key, model: client, batch_size=2,
+                                max_delay=0.01, max_concurrent_requests=4, memory_cache_size=3)
+        texts = [f"text {i}" for i in range(400)]
+        errors = []
+
+        def remember(worker):
+            # What each request thread does with a finished batch, many times over
+            try:
+                for i in range(5000):
+                    translator._remember(f"{worker}-{i}", "en-ar", "x", persist=False)
+            except Exception as e:
+                errors.append(e)
+
+        # Switch threads as often as possible so unguarded evictions would collide
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=remember, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            results = self.translate_concurrently(translator, texts)
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, ["T:" + text for text in texts])
+        self.assertLessEqual(len(translator._memory), 3)
+
+    def test_missing_ids_fall_back_to_single_requests(self):
+        client = FakeGemini(drop={"2"})
+        translator = self.translator(client)
+        results = translator.translate_many(["alpha", "beta", "gamma"], "ar")
+
+        self.assertEqual(results, ["T:alpha", "T:beta", "T:gamma"])
+        self.assertEqual(len(client.prompts), 2)
+        self.assertNotIn("{", client.prompts[1])
+
+    def test_second_call_is_served_from_cache(self):
+        client = FakeGemini()
+        self.translator(client).translate_many(["hello", "world"], "ar")
+        self.assertEqual(len(client.prompts), 1)
+
+        # A new translator only shares the on-disk cache
+        fresh = FakeGemini(prefix="NEW:")
+        self.assertEqual(self.translator(fresh).translate_many(["hello", "world"], "ar"), ["T:hello", "T:world"])
+        self.assertEqual(fresh.prompts, [])
+
+
+class ArabicCorrectorTest(unittest.TestCase):
+    def corrector(self, client, **options):
+        return ArabicCorrector("key", client_factory=lambda key, model: client, **options)
+
+    def test_corrections_map_back_by_id(self):
+        client = FakeGemini(prefix="C:")
+        texts = [f"- نص {i}" for i in range(25)]
+        corrected = self.corrector(client, batch_size=10).correct(texts)
+
+        self.assertEqual(corrected, ["C:" + text for text in texts])
+        self.assertEqual(len(client.prompts), 3)
+
+    def test_missing_ids_keep_the_original_text(self):
+        client = FakeGemini(prefix="C:", drop={"1", "3"})
+        texts = ["- أ", "- ب", "", "- ج", "[خطأ]"]
+        corrected = self.corrector(client).correct(texts)
+
+        self.assertEqual(corrected, ["C:- أ", "- ب", "", "- ج", "[خطأ]"])
+        sent = json.loads(client.prompts[0][client.prompts[0].find("{"):])
+        self.assertEqual(sorted(sent), ["0", "1", "3"])
+
+    def test_failed_batch_keeps_the_original_text(self):
+        class Failing(FakeGemini):
+            def generate_content(self, prompt):
+                if "FAIL" in prompt:
+                    raise RuntimeError("service unavailable")
+                return super().generate_content(prompt)
+
+        texts = ["- a", "- b FAIL", "- c", "- d"]
+        corrected = self.corrector(Failing(prefix="C:"), batch_size=2).correct(texts)
+
+        self.assertEqual(corrected, ["- a", "- b FAIL", "C:- c", "C:- d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vad import NoiseFloorTracker
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 15
+
+
+def chunk(speech, noise, pauses=False, seed=0):
+    """A tone standing in for a voice, optionally switching on and off, over white noise"""
+    t = np.arange(SAMPLE_RATE * CHUNK_SECONDS) / SAMPLE_RATE
+    voice = np.sin(2 * np.pi * 180 * t)
+    if pauses:
+        voice *= np.sin(2 * np.pi * 0.4 * t) > 0
+    rng = np.random.default_rng(seed)
+    return (speech * voice + noise * rng.standard_normal(len(t))).astype(np.float32)
+
+
+class NoiseFloorTrackerTest(unittest.TestCase):
+    def speech_ms(self, chunks):
+        tracker = NoiseFloorTracker()
+        return [tracker.measure(samples).speech_ms for samples in chunks]
+
+    def test_continuous_speech_is_kept(self):
+        for speech_ms in self.speech_ms(chunk(0.1, 0.01, seed=i) for i in range(3)):
+            self.assertGreater(speech_ms, 250)
+
+    def test_speech_in_loud_noise_is_kept(self):
+        for speech_ms in self.speech_ms(chunk(0.1, 0.05, pauses=True, seed=i) for i in range(3)):
+            self.assertGreater(speech_ms, 250)
+
+    def test_quiet_speech_is_kept(self):
+        for speech_ms in self.speech_ms(chunk(0.01, 0.01, pauses=True, seed=i) for i in range(3)):
+            self.assertGreater(speech_ms, 250)
+
+    def test_noise_after_speech_is_gated(self):
+        talk = chunk(0.1, 0.01, pauses=True)
+        noise = [chunk(0, 0.01, seed=i) for i in range(1, 4)]
+        speech_ms = self.speech_ms([talk] + noise + [talk])
+        self.assertGreater(speech_ms[0], 250)
+        self.assertEqual(speech_ms[1:4], [0, 0, 0])
+        self.assertGreater(speech_ms[4], 250)
+
+    def test_digital_silence_is_gated(self):
+        self.assertEqual(self.speech_ms([np.zeros(SAMPLE_RATE * CHUNK_SECONDS, dtype=np.float32)]), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import re
+
+# Phrases that mark a segment as inaudible or unintelligible. The
+# lookahead on the first letter lets the scanner skip most word starts
+# without trying every alternative.
+NOISE_PHRASES = (
+    r"background|noise|static|silence|hum|buzz|interference"
+    r"|(?:muffled|unclear|distant|faint)\s+(?:voice|speech|sound|audio)"
+    r"|(?:low|poor)\s+quality"
+)
+UNCLEAR_PHRASES = (
+    r"unintelligible|incomprehensible|indiscernible"
+    r"|(?:cannot|can't)\s+(?:understand|hear|make out)"
+    r"|(?:unclear|inaudible)\s+(?:speech|words|segment)"
+)
+NOISE_PATTERN = re.compile(rf"\b(?=[bdfhilmnpsu])(?:{NOISE_PHRASES})\b", re.IGNORECASE)
+UNCLEAR_PATTERN = re.compile(rf"\b(?=[ciu])(?:{UNCLEAR_PHRASES})\b", re.IGNORECASE)
+# Either kind, so most segments are scanned once
+MARKER_PATTERN = re.compile(rf"\b(?=[bcdfhilmnpsu])(?:{NOISE_PHRASES}|{UNCLEAR_PHRASES})\b", re.IGNORECASE)
+
+# A word repeated ("the the") becomes one bold word
+REPEAT_PATTERN = re.compile(r"\b(?=(\w+))\1(?:\s+\1\b)+")
+UNDERSCORE_PATTERN = re.compile(r"_(\w+)_")
+
+
+def process_text(text, timestamp):
+    """Mark noise and unclear speech, emphasis and repetitions in one segment's text"""
+    if MARKER_PATTERN.search(text):
+        if NOISE_PATTERN.search(text):
+            text = f"[inaudible {timestamp}] {text}"
+        if UNCLEAR_PATTERN.search(text):
+            text = f"[unintelligible {timestamp}] {text}"
+
+    words = text.split()
+    # Only uppercase words and !words! are emphasized
+    if not text.islower() or "!" in text:
+        words = [
+            f"**{word}**" if word.isupper() and len(word) > 1
+            else f"*{word}*" if word[0] == "!" and word[-1] == "!"
+            else word
+            for word in words
+        ]
+    text = " ".join(words)
+
+    if REPEAT_PATTERN.search(text):
+        text = REPEAT_PATTERN.sub(r"**\1**", text)
+    if "_" in text:
+        text = UNDERSCORE_PATTERN.sub(r"*\1*", text)
+    return text
+
+
+def process_texts(texts, timestamps):
+    """process_text over a list of segments, e.g. a whole transcript"""
+    return [process_text(text, timestamp) for text, timestamp in zip(texts, timestamps)]
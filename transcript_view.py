@@ -0,0 +1,207 @@
+import tkinter as tk
+from tkinter import ttk
+from segments import SegmentStore, parse_timestamp
+
+COLUMNS = ('timestamp', 'english', 'arabic')
+DEFAULT_ROW_HEIGHT = 20
+
+
+class TranscriptView:
+    """Virtualized table of transcript segments.
+
+    Only the rows that fit in the window exist as Treeview items; scrolling
+    moves a window over `segments` (a SegmentStore) and rewrites those few
+    items, so memory and redraw cost stay the
+    same however long the transcript gets. Call refresh() after appending
+    to the sequence; the view follows new rows while scrolled to the end.
+    on_select(index, segment) is called when the user selects a row.
+    """
+
+    def __init__(self, parent, segments=None, on_select=None, height=15):
+        self.segments = segments if segments is not None else SegmentStore()
+        self.on_select = on_select
+        self.top = 0
+        self.selected = None
+        self.visible = height
+        self._items = []
+        self._rendered_count = 0
+        self._rendering = False
+
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.frame, columns=COLUMNS, show='headings', height=height,
+                                 selectmode='browse')
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.tree.heading('timestamp', text='Timestamp')
+        self.tree.heading('english', text='English Text')
+        self.tree.heading('arabic', text='Arabic Text')
+        self.tree.column('timestamp', width=120, minwidth=100)
+        self.tree.column('english', width=400, minwidth=300)
+        self.tree.column('arabic', width=400, minwidth=300)
+
+        # The scrollbar moves the window over the segments, not the Treeview itself
+        self.v_scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        h_scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda event: self._scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda event: self._scroll_by(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page-up'), ('<Next>', 'page-down'),
+                          ('<Home>', 'home'), ('<End>', 'end')):
+            self.tree.bind(key, lambda event, step=step: self._on_key(step))
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    # Data
+
+    def set_segments(self, segments):
+        self.segments = segments
+        self.top = 0
+        self.selected = None
+        self._render()
+
+    def refresh(self):
+        """Redraw after segments were appended or edited"""
+        if self.top + self.visible >= self._rendered_count:
+            self.top = self._max_top()
+        self._render()
+
+    def index_at_time(self, seconds):
+        """Index of the segment playing at `seconds`, or None when there are none"""
+        return self.segments.index_at(int(seconds * 1000))
+
+    def jump_to_timestamp(self, text):
+        """Select the segment at a "HH:MM:SS" time; returns its index or None"""
+        seconds = parse_timestamp(text)
+        if seconds is None:
+            return None
+        index = self.index_at_time(seconds)
+        if index is not None:
+            self.select(index)
+        return index
+
+    # Selection and scrolling
+
+    def select(self, index):
+        if not self.segments:
+            return
+        index = min(max(0, index), len(self.segments) - 1)
+        self.selected = index
+        self.see(index)
+        if self.on_select:
+            self.on_select(index, self.segments[index])
+
+    def selected_segment(self):
+        if self.selected is None or self.selected >= len(self.segments):
+            return None
+        return self.segments[self.selected]
+
+    def see(self, index):
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible:
+            self.top = index - self.visible + 1
+        self._render()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.segments))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            self.top += step * self.visible if args[2] == 'pages' else step
+        self._render()
+
+    def _scroll_by(self, rows):
+        self.top += rows
+        self._render()
+        return 'break'
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        steps = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self._scroll_by(steps * 3)
+
+    def _on_key(self, step):
+        current = self.selected if self.selected is not None else self.top
+        if step == 'page-up':
+            index = current - self.visible
+        elif step == 'page-down':
+            index = current + self.visible
+        elif step == 'home':
+            index = 0
+        elif step == 'end':
+            index = len(self.segments) - 1
+        else:
+            index = current + step
+        self.select(index)
+        return 'break'
+
+    def _on_resize(self, event):
+        row_height = self._row_height()
+        # One row's worth of height goes to the headings
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _row_height(self):
+        try:
+            return int(ttk.Style().lookup('Treeview', 'rowheight')) or DEFAULT_ROW_HEIGHT
+        except (ValueError, tk.TclError):
+            return DEFAULT_ROW_HEIGHT
+
+    def _on_tree_select(self, event):
+        if self._rendering:
+            return
+        selection = self.tree.selection()
+        if selection and selection[0] in self._items:
+            index = self.top + self._items.index(selection[0])
+            if index != self.selected and index < len(self.segments):
+                self.select(index)
+
+    # Drawing
+
+    def _max_top(self):
+        return max(0, len(self.segments) - self.visible)
+
+    def _render(self):
+        count = len(self.segments)
+        self._rendered_count = count
+        self.top = min(max(0, self.top), self._max_top())
+        rows = min(self.visible, count - self.top)
+
+        self._rendering = True
+        try:
+            while len(self._items) < rows:
+                self._items.append(self.tree.insert('', tk.END, values=('', '', '')))
+            if len(self._items) > rows:
+                self.tree.delete(*self._items[rows:])
+                del self._items[rows:]
+
+            for offset, item in enumerate(self._items):
+                segment = self.segments[self.top + offset]
+                self.tree.item(item, values=(segment.timestamp, segment.english, segment.arabic))
+
+            selected = self.selected
+            if selected is not None and self.top <= selected < self.top + rows:
+                self.tree.selection_set(self._items[selected - self.top])
+            elif self.tree.selection():
+                self.tree.selection_remove(*self.tree.selection())
+        finally:
+            self._rendering = False
+
+        if count:
+            self.v_scrollbar.set(self.top / count, (self.top + rows) / count)
+        else:
+            self.v_scrollbar.set(0, 1)
@@ -1,282 +1,473 @@
 import os
-import re
-import speech_recognition as sr
-import google.generativeai as genai
-import whisper
-from pydub import AudioSegment
-from pydub.utils import make_chunks
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from recognizers import DEFAULT_RECOGNIZERS, RECOGNIZERS, RecognitionError, create_recognizer
+from process_backend import get_process_backend
+from cancellation import Cancelled, as_token
+from scheduler import Job
+from result_cache import get_result_cache, make_key, file_digest, samples_digest
+from dsp import language_preset
+from translation import Translator
+from text_processing import process_text, process_texts
+from segments import Segment, SegmentStore, format_timestamp, parse_timestamp
+from audio_stream import PipeSource, probe_duration, stream_chunks, stream_speech_chunks
+
+# How often a wait on running segments checks for cancellation
+CANCEL_POLL_SECONDS = 0.2
+
+# Queued by the chunk reader after the last task
+_END_OF_TASKS = object()
+
+# Fixed-length chunks with less speech than this above their noise floor
+# are not sent to the recognizer
+MIN_SPEECH_MS = 250
 
 class TranscriptionEngine:
     def __init__(self, progress_callback=None):
         self.progress_callback = progress_callback
         self.gemini_api_key = ""
         self.translate_var = False
+        self.language = "en-US"
+        cpu_count = os.cpu_count() or 4
+        self.max_workers_english = min(6, max(2, cpu_count))
+        self.max_workers_arabic = 1
+        self.whisper_model_size = "medium"
+        self.whisper_device = None
+        self.whisper_batch_size = 1
+        self.execution_backend = "thread"
+        self.process_workers = None
+        self.segmentation = "fixed"
+        self.noise_gate = True
+        self.recognizers = dict(DEFAULT_RECOGNIZERS)
+        self.result_cache = get_result_cache()
+        self.translator = Translator(cache=self.result_cache)
         
     def set_gemini_api_key(self, api_key):
         self.gemini_api_key = api_key
+        self.translator.set_api_key(api_key)
         
     def set_translate_option(self, translate):
         self.translate_var = translate
         
-    def format_timestamp(self, seconds):
-        total_seconds = int(seconds)
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, secs = divmod(remainder, 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    
-    def translate_text(self, text, target_language="ar"):
-        if not self.gemini_api_key or not text.strip():
-            return ""
+    def set_language(self, language):
+        self.language = language
         
-        try:
-            genai.configure(api_key=self.gemini_api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            if target_language == "ar":
-                prompt = f"Translate the following English text to Arabic. Only return the translation, no explanations:\n\n{text}"
-            else:
-                prompt = f"Translate the following Arabic text to English. Only return the translation, no explanations:\n\n{text}"
-                
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return f"[Translation Error: {str(e)}]"
-    
-    def process_transcription_text(self, text, timestamp):
-        processed_text = text
+    def set_whisper_model(self, model_size, device=None):
+        self.whisper_model_size = model_size
+        self.whisper_device = device
         
-        # Check for noise patterns
-        background_noise_patterns = [
-            r'\b(background|noise|static|silence|hum|buzz|interference)\b',
-            r'\b(muffled|unclear|distant|faint)\s+(voice|speech|sound|audio)\b',
-            r'\b(low|poor)\s+quality\b'
-        ]
+    def set_whisper_batch_size(self, batch_size):
+        """Number of chunks decoded per Whisper forward pass (1 disables batching)"""
+        self.whisper_batch_size = max(1, int(batch_size))
         
-        for pattern in background_noise_patterns:
-            if re.search(pattern, processed_text, re.IGNORECASE):
-                processed_text = f"[inaudible {timestamp}] {processed_text}"
-                break
+    def set_segmentation(self, mode):
+        """Cut audio into "fixed" length segments or "vad" speech regions"""
+        if mode not in ("fixed", "vad"):
+            raise ValueError(f"Unknown segmentation mode: {mode}")
+        self.segmentation = mode
         
-        # Check for unclear segments
-        unclear_patterns = [
-            r'\b(unintelligible|incomprehensible|indiscernible)\b',
-            r'\b(cannot|can\'t)\s+(understand|hear|make out)\b',
-            r'\b(unclear|inaudible)\s+(speech|words|segment)\b'
-        ]
+    def set_noise_gate(self, enabled):
+        """Skip recognition of fixed-length chunks that hold no speech above the noise floor"""
+        self.noise_gate = bool(enabled)
         
-        for pattern in unclear_patterns:
-            if re.search(pattern, processed_text, re.IGNORECASE):
-                processed_text = f"[unintelligible {timestamp}] {processed_text}"
-                break
+    def set_execution_backend(self, backend, workers=None):
+        """Run recognition in "thread" (default) or "process" pool workers"""
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown execution backend: {backend}")
+        self.execution_backend = backend
+        self.process_workers = workers
         
-        # Process emphasis patterns
-        words = processed_text.split()
-        for i, word in enumerate(words):
-            if word.isupper() and len(word) > 1:
-                words[i] = f"**{word}**"
-            elif word.startswith('!') and word.endswith('!'):
-                words[i] = f"*{word}*"
+    def set_recognizer(self, language, name):
+        """Choose the recognizer backend used for a language"""
+        if name not in RECOGNIZERS:
+            raise ValueError(f"Unknown recognizer: {name}")
+        self.recognizers[language] = name
         
-        processed_text = ' '.join(words)
-        processed_text = re.sub(r'(\b\w+\b)(\s+\1\b)+', r'**\1**', processed_text)
-        processed_text = re.sub(r'\*(\w+)\*', r'*\1*', processed_text)
-        processed_text = re.sub(r'_(\w+)_', r'*\1*', processed_text)
-        processed_text = re.sub(r'\*\*(\w+)\*\*', r'**\1**', processed_text)
+    def create_recognizer(self, language=None):
+        """Build the recognizer configured for a language with the current model settings"""
+        language = language or self.language
+        name = self.recognizers.get(language, "google")
+        options = {}
+        if name == "whisper":
+            options = {"model_size": self.whisper_model_size, "device": self.whisper_device,
+                       "batch_size": self.whisper_batch_size}
+        elif name == "faster-whisper":
+            options = {"model_size": self.whisper_model_size, "device": self.whisper_device}
+        return create_recognizer(name, language, **options)
         
-        return processed_text
+    def format_timestamp(self, seconds):
+        return format_timestamp(int(seconds) * 1000)
+    
+    def translate_text(self, text, target_language="ar"):
+        if not self.gemini_api_key or not text.strip():
+            return ""
+        return self.translator.translate(text, target_language)
     
-    def transcribe_audio_segments(self, audio_path, segment_length_sec=15.0, is_transcribing=True):
-        audio = AudioSegment.from_file(audio_path)
+    def process_transcription_text(self, text, timestamp):
+        return process_text(text, timestamp)
+    
+    def transcribe_audio_segments(self, audio_path, segment_length_sec=15.0, cancel=None,
+                                  segment_callback=None, job=None):
+        """Transcribe a file and return its segments as a SegmentStore.
 
-        if self.language == "ar-AR":
-            audio = (
-                audio.set_channels(1)
-                     .set_frame_rate(16000)
-                     .normalize()
-                     .low_pass_filter(8000)
-                     .high_pass_filter(100)
-            )
-        else:
-            audio = (
-                audio.low_pass_filter(3500)
-                     .high_pass_filter(300)
-                     .normalize()
-                     .set_channels(1)
-                     .set_frame_rate(16000)
-            )
+        If segment_callback is given it is called with each Segment, in
+        order, as soon as it is available. Cancelling the token stops the
+        job and returns the segments finished so far.
+        """
+        transcription_data = SegmentStore()
+        for segment in self.iter_transcription(audio_path, segment_length_sec, cancel, job):
+            transcription_data.append(segment)
+            if segment_callback:
+                segment_callback(segment)
+        return transcription_data
+
+    def iter_transcription(self, audio_path, segment_length_sec=15.0, cancel=None, job=None):
+        """Yield Segments in order as soon as each one and all earlier ones are done.
 
+        audio_path may also be a PipeSource (e.g. a YouTube stream), which is
+        transcribed while it downloads. cancel is a CancellationToken (a
+        plain bool is accepted for older callers); once cancelled, decoding
+        stops, queued segments are dropped and the generator ends without
+        waiting for running ones.
+
+        When job (a scheduler.Job) is given, segments run on the
+        scheduler's shared worker pool instead of a pool of their own, the
+        job's token cancels the run and progress is reported on the job.
+        """
+        if cancel is None and job is not None:
+            cancel = job.cancel_token
+        cancel = as_token(cancel)
         chunk_length_ms = int(segment_length_sec * 1000)
-        chunks = make_chunks(audio, chunk_length_ms)
-        total_chunks = len(chunks)
+        recognizer = self.create_recognizer()
+        recognizer_settings = recognizer.settings()
+        cache = self.result_cache
 
-        if self.progress_callback:
-            self.progress_callback(f"Starting transcription... {total_chunks} segments")
+        # A previous run over the same audio with the same settings is replayed as is
+        job_key = None
+        if cache:
+            try:
+                if isinstance(audio_path, PipeSource):
+                    source_digest = audio_path.cache_key
+                else:
+                    source_digest = file_digest(audio_path)
+                if source_digest:
+                    job_key = make_key(
+                        "job", source_digest, recognizer_settings, self.segmentation,
+                        chunk_length_ms, language_preset(self.language),
+                        self.translate_var, bool(self.gemini_api_key), self.noise_gate,
+                    )
+                cached_segments = cache.get(job_key) if job_key else None
+            except OSError:
+                cached_segments = None
+            if cached_segments is not None:
+                if self.progress_callback:
+                    self.progress_callback(f"Using cached transcription... {len(cached_segments)} segments")
+                yield from SegmentStore.from_dicts(cached_segments)
+                return
 
-        # Pre-export chunks to temporary files
-        chunk_files = []
-        for i, chunk in enumerate(chunks):
-            if not is_transcribing:
-                break
-            timestamp_start = i * (chunk_length_ms // 1000)
-            timestamp_str = self.format_timestamp(timestamp_start)
-            chunk_filename = f"{audio_path}_chunk{i}.wav"
-            chunk.export(chunk_filename, format="wav")
-            chunk_files.append((i, chunk_filename, timestamp_str))
-
-        if not is_transcribing:
-            for _, path, _ in chunk_files:
-                try:
-                    os.remove(path)
-                except Exception:
-                    pass
-            return []
+        # Decode, resample and filter through an ffmpeg pipe one chunk at a time
+        levels = None
+        if self.segmentation == "vad":
+            # Speech regions up to the segment length; the count isn't known ahead
+            source = stream_speech_chunks(audio_path, self.language, chunk_length_ms, cancel=cancel)
+            total_chunks = None
+        else:
+            # Each chunk's noise floor and speech content, measured as it is cut
+            levels = {} if self.noise_gate else None
+            source = stream_chunks(audio_path, self.language, chunk_length_ms, cancel=cancel, levels=levels)
+            duration = probe_duration(audio_path)
+            total_chunks = math.ceil(duration * 1000 / chunk_length_ms) if duration else None
 
-        def transcribe_english(index, chunk_path, timestamp_str, baseline_energy):
-            recognizer = sr.Recognizer()
-            recognizer.energy_threshold = baseline_energy
-            recognizer.dynamic_energy_threshold = True
-            recognizer.dynamic_energy_adjustment_damping = 0.15
-            recognizer.dynamic_energy_ratio = 1.5
+        spans = {}
+        run_state = {"read": 0, "exhausted": False, "failed": False, "silent": 0}
 
-            english_text = ""
-            arabic_text = ""
-            try:
-                with sr.AudioFile(chunk_path) as source:
-                    audio_data = recognizer.record(source)
-                text = recognizer.recognize_google(audio_data, language="en-US")
-                text = self.process_transcription_text(text, timestamp_str)
-                english_text = text
-                if self.translate_var and self.gemini_api_key:
-                    arabic_text = self.translate_text(text)
-                elif self.translate_var:
-                    arabic_text = "[API key needed for translation]"
-            except sr.UnknownValueError:
-                english_text = "[No speech detected]"
-            except sr.RequestError as e:
-                english_text = f"[API Error: {e}]"
-            finally:
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
-            return index, timestamp_str, english_text, arabic_text
+        def read_chunks():
+            for i, start_ms, end_ms, samples in source:
+                spans[i] = (start_ms, end_ms)
+                run_state["read"] += 1
+                yield i, samples, self.format_timestamp(start_ms // 1000)
+            run_state["exhausted"] = True
+
+        chunks = read_chunks()
 
-        def transcribe_arabic(index, chunk_path, timestamp_str, whisper_model):
-            english_text = ""
-            arabic_text = ""
+        if self.progress_callback:
+            if total_chunks:
+                self.progress_callback(f"Starting transcription... {total_chunks} segments")
+            else:
+                self.progress_callback("Starting transcription...")
+
+        if cancel.cancelled:
+            return
+
+        process_backend = None
+        if self.execution_backend == "process":
+            process_backend = get_process_backend(self.process_workers)
+        else:
             try:
-                result = whisper_model.transcribe(
-                    chunk_path,
-                    language="ar",
-                    task="transcribe",
-                    initial_prompt=(
-                        "Transcribe in Modern Standard Arabic. If this is a conversation, "
-                        "format each speaker's line with a dash (-) at the beginning. "
-                        "If there's a clear speaker identification, include it with a colon."
-                    ),
-                )
-                text = result.get("text", "").strip()
-                text = self.process_transcription_text(text, timestamp_str)
+                recognizer.load()
+            except Exception as e:
+                if self.progress_callback:
+                    self.progress_callback(f"Failed to load {recognizer.name} model: {e}")
+                return
+
+        def cache_lookup(chunk_samples):
+            """Cached recognizer output for identical audio, as (key, entry)"""
+            if not cache:
+                return None, None
+            key = make_key("segment", samples_digest(chunk_samples), recognizer_settings)
+            return key, cache.get(key)
+
+        def cache_store(key, text):
+            if key:
+                cache.put(key, {"text": text})
+
+        def recognize(batch):
+            """Recognized text (None for no speech) for each (index, samples, timestamp) chunk"""
+            lookups = [cache_lookup(view) for _, view, _ in batch]
+            texts = [hit["text"] if hit is not None else None for _, hit in lookups]
+            misses = [i for i, (_, hit) in enumerate(lookups) if hit is None]
+            if misses:
+                views = [batch[i][1] for i in misses]
+                if process_backend:
+                    future = process_backend.submit(recognizer.spec(), views)
+                    # Drop the request if it hasn't reached a worker by the time the job stops
+                    unregister = cancel.on_cancel(future.cancel)
+                    try:
+                        recognized = future.result()
+                    finally:
+                        unregister()
+                else:
+                    recognized = recognizer.transcribe_batch(views)
+                for i, text in zip(misses, recognized):
+                    texts[i] = text
+                    cache_store(lookups[i][0], text)
+            return texts
+
+        def finish_english(batch, texts):
+            speech = [i for i, text in enumerate(texts) if text is not None]
+            texts = list(texts)
+            for i, text in zip(speech, process_texts([texts[i] for i in speech], [batch[i][2] for i in speech])):
+                texts[i] = text
+            translations = [""] * len(texts)
+            if self.translate_var and self.gemini_api_key:
+                # Translate the whole batch in one request
+                for i, translation in zip(speech, self.translator.translate_many([texts[i] for i in speech], "ar")):
+                    translations[i] = translation
+            elif self.translate_var:
+                translations = ["[API key needed for translation]"] * len(texts)
+            results = []
+            for (idx, _, ts), text, arabic_text in zip(batch, texts, translations):
+                if text is None:
+                    results.append((idx, ts, "[No speech detected]", ""))
+                else:
+                    results.append((idx, ts, text, arabic_text))
+            return results
+
+        def finish_arabic(batch, texts):
+            texts = process_texts([text or "" for text in texts], [ts for _, _, ts in batch])
+            translations = [None] * len(texts)
+            if self.translate_var and self.gemini_api_key:
+                translations = self.translator.translate_many(texts, "en")
+            elif self.translate_var:
+                translations = ["[API key needed for translation]"] * len(texts)
+            results = []
+            for (idx, _, ts), text, english_text in zip(batch, texts, translations):
                 if text.count("-") > 1 or ":" in text:
                     arabic_text = text
                 else:
                     arabic_text = f"- {text}" if text and not text.startswith("-") else text
-                if self.translate_var and self.gemini_api_key:
-                    english_text = self.translate_text(text, "en")
-                elif self.translate_var:
-                    english_text = "[API key needed for translation]"
-            except Exception as e:
-                print(f"Whisper transcription error: {e}")
-                arabic_text = "[خطأ في التعرف على الكلام]"
-            finally:
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
-            return index, timestamp_str, english_text, arabic_text
+                results.append((idx, ts, english_text or "", arabic_text))
+            return results
 
-        transcription_data = []
-        futures = []
-        
-        if self.language == "ar-AR":
+        def finish(batch, texts):
+            if self.language == "ar-AR":
+                return finish_arabic(batch, texts)
+            return finish_english(batch, texts)
+
+        def skip_silent(batch):
+            if cancel.cancelled:
+                return []
+            return finish(batch, [None] * len(batch))
+
+        def transcribe_batch(batch):
+            if cancel.cancelled:
+                return []
             try:
-                whisper_model = whisper.load_model("medium")
+                texts = recognize(batch)
             except Exception as e:
-                if self.progress_callback:
-                    self.progress_callback(f"Failed to load Whisper model: {e}")
-                for _, path, _ in chunk_files:
-                    try:
-                        os.remove(path)
-                    except Exception:
-                        pass
-                return []
-                
+                if cancel.cancelled:
+                    return []
+                print(f"{recognizer.name} transcription error: {e}")
+                run_state["failed"] = True
+                if self.language == "ar-AR":
+                    return [(idx, ts, "", "[خطأ في التعرف على الكلام]") for idx, _, ts in batch]
+                message = str(e) if isinstance(e, RecognitionError) else f"Recognition Error: {e}"
+                return [(idx, ts, f"[{message}]", "") for idx, _, ts in batch]
+            return finish(batch, texts)
+
+        if self.language == "ar-AR":
             max_workers = self.max_workers_arabic
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                for idx, path, ts in chunk_files:
-                    if not is_transcribing:
-                        break
-                    futures.append(executor.submit(transcribe_arabic, idx, path, ts, whisper_model))
-                
-                completed = 0
-                next_index = 0
-                results_by_index = {}
-                for future in as_completed(futures):
-                    if not is_transcribing:
-                        break
-                    idx, ts, en_text, ar_text = future.result()
-                    results_by_index[idx] = (ts, en_text, ar_text)
-                    
-                    while next_index in results_by_index:
-                        ts_f, en_f, ar_f = results_by_index.pop(next_index)
-                        segment_data = {'timestamp': ts_f, 'english': en_f, 'arabic': ar_f}
-                        transcription_data.append(segment_data)
-                        completed += 1
-                        if self.progress_callback:
-                            self.progress_callback(f"Segment {completed}/{total_chunks}")
-                        next_index += 1
         else:
             max_workers = self.max_workers_english
-            try:
-                tmp_rec = sr.Recognizer()
-                with sr.AudioFile(chunk_files[0][1]) as source0:
-                    tmp_rec.adjust_for_ambient_noise(source0, duration=0.3)
-                    baseline_energy = tmp_rec.energy_threshold
-            except Exception:
-                baseline_energy = 300
-                
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                for idx, path, ts in chunk_files:
-                    if not is_transcribing:
-                        break
-                    futures.append(executor.submit(transcribe_english, idx, path, ts, baseline_energy))
-                
-                completed = 0
-                next_index = 0
-                results_by_index = {}
-                for future in as_completed(futures):
-                    if not is_transcribing:
-                        break
-                    idx, ts, en_text, ar_text = future.result()
-                    results_by_index[idx] = (ts, en_text, ar_text)
-                    
-                    while next_index in results_by_index:
-                        ts_f, en_f, ar_f = results_by_index.pop(next_index)
-                        segment_data = {'timestamp': ts_f, 'english': en_f, 'arabic': ar_f}
-                        transcription_data.append(segment_data)
-                        completed += 1
-                        if self.progress_callback:
-                            self.progress_callback(f"Segment {completed}/{total_chunks}")
-                        next_index += 1
-
-        # Cleanup remaining chunk files
-        for _, path, _ in chunk_files:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-            except Exception:
-                pass
+        if process_backend:
+            # Threads only wait on worker processes; keep every worker busy
+            max_workers = max(max_workers, process_backend.workers)
+        elif recognizer.max_threads:
+            max_workers = min(max_workers, recognizer.max_threads)
 
-        return transcription_data
+        def tasks():
+            batch = []
+            for idx, view, ts in chunks:
+                level = levels.pop(idx, None) if levels is not None else None
+                if level is not None and level.speech_ms < MIN_SPEECH_MS:
+                    run_state["silent"] += 1
+                    yield skip_silent, [(idx, view, ts)]
+                elif recognizer.max_batch > 1 and recognizer.can_batch(view):
+                    batch.append((idx, view, ts))
+                    if len(batch) == recognizer.max_batch:
+                        yield transcribe_batch, batch
+                        batch = []
+                else:
+                    yield transcribe_batch, [(idx, view, ts)]
+            if batch:
+                yield transcribe_batch, batch
+
+        if job is not None:
+            # Shared pool; max_workers only caps this job's share of it
+            job.set_concurrency(max_workers)
+            job.set_progress(0, total_chunks)
+            executor = job
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        segments = SegmentStore()
+        try:
+            # Keep a bounded number of chunks in flight so memory stays flat on long inputs
+            for segment in self._in_order(executor, tasks(), max_workers * 2, total_chunks, cancel, spans):
+                segments.append(segment)
+                yield segment
+        except Cancelled:
+            pass
+        finally:
+            # Drop queued work if the consumer stops early; after a cancel,
+            # don't wait for segments that are still running either
+            executor.shutdown(wait=not cancel.cancelled, cancel_futures=True)
+
+        if cancel.cancelled:
+            if self.progress_callback:
+                self.progress_callback(f"Transcription stopped after {len(segments)} segments")
+            return
+
+        if self.progress_callback:
+            if run_state["silent"]:
+                self.progress_callback(
+                    f"Skipped recognition of {run_state['silent']} segments without speech "
+                    f"(turn the noise gate off to send them anyway)"
+                )
+            if isinstance(audio_path, PipeSource):
+                self.progress_callback(audio_path.summary())
+
+        # Remember complete, error-free runs so they can be replayed
+        translation_failed = any(
+            text.startswith("[Translation Error") for texts in (segments.english, segments.arabic) for text in texts
+        )
+        if (job_key and run_state["exhausted"] and not run_state["failed"] and not translation_failed
+                and len(segments) == run_state["read"]):
+            cache.put(job_key, segments.to_dicts())
+
+    def _read_ahead(self, tasks, ready, stop):
+        """Reader thread: pull tasks (and so decode chunks) into a bounded queue"""
+        def put(item):
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=CANCEL_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for task in tasks:
+                if not put(task):
+                    break
+            else:
+                put(_END_OF_TASKS)
+        except BaseException as e:
+            put(e)
+        finally:
+            # Closing the generator here stops the decoder (and its ffmpeg process)
+            close = getattr(tasks, "close", None)
+            if close:
+                close()
+
+    def _in_order(self, executor, tasks, max_in_flight, total_chunks=None, cancel=None, spans=None):
+        """Submit tasks with a bounded window and yield segments in index order.
+
+        Tasks are pulled from a reader thread, so each chunk is submitted as
+        soon as it has been decoded and finished segments are yielded while
+        a slow source (such as a download) is still producing the rest.
+        """
+        cancel = as_token(cancel)
+        ready = queue.Queue(maxsize=max_in_flight)
+        stop = threading.Event()
+        unregister = cancel.on_cancel(stop.set)
+        reader = threading.Thread(target=self._read_ahead, args=(iter(tasks), ready, stop), daemon=True)
+        reader.start()
+        try:
+            yield from self._collect(executor, ready, max_in_flight, total_chunks, cancel, spans)
+        finally:
+            stop.set()
+            unregister()
+
+    def _collect(self, executor, ready, max_in_flight, total_chunks, cancel, spans):
+        pending = set()
+        reading_done = False
+        completed = 0
+        next_index = 0
+        results_by_index = {}
+        while True:
+            if cancel.cancelled:
+                for future in pending:
+                    future.cancel()
+                break
+            # Submit whatever has been read; only block for input when idle
+            while not reading_done and len(pending) < max_in_flight:
+                try:
+                    item = ready.get(block=not pending, timeout=CANCEL_POLL_SECONDS)
+                except queue.Empty:
+                    break
+                if item is _END_OF_TASKS:
+                    reading_done = True
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    pending.add(executor.submit(*item))
+            if not pending:
+                if reading_done:
+                    break
+                continue
+
+            # Wake up periodically so a cancel is noticed while segments are running
+            done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                for idx, ts, en_text, ar_text in (result if isinstance(result, list) else [result]):
+                    results_by_index[idx] = (ts, en_text, ar_text)
+            
+            while next_index in results_by_index:
+                ts_f, en_f, ar_f = results_by_index.pop(next_index)
+                completed += 1
+                if isinstance(executor, Job):
+                    executor.set_progress(completed, total_chunks)
+                if self.progress_callback:
+                    if total_chunks:
+                        self.progress_callback(f"Segment {completed}/{total_chunks}")
+                    else:
+                        self.progress_callback(f"Segment {completed}")
+                if spans is not None and next_index in spans:
+                    start_ms, end_ms = spans.pop(next_index)
+                else:
+                    start_ms = end_ms = int((parse_timestamp(ts_f) or 0) * 1000)
+                next_index += 1
+                yield Segment(start_ms, end_ms, en_f, ar_f)
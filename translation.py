@@ -0,0 +1,365 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from result_cache import make_key
+
+GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+LANGUAGE_NAMES = {"ar": "Arabic", "en": "English"}
+
+
+class GeminiReply:
+    def __init__(self, text):
+        self.text = text
+
+
+class GeminiClient:
+    """Gemini generateContent over REST through the shared "gemini" HTTP client.
+
+    Mirrors the generate_content(prompt).text interface of
+    google.generativeai, but every call is rate limited, retried on
+    throttling and server errors, and sent over a kept-alive connection.
+    GEMINI_API_BASE points it at another server, e.g. a local mock.
+    """
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL, base_url=None, http=None):
+        from http_client import get_http_client
+
+        self.api_key = api_key
+        self.model_name = model_name
+        self.base_url = (base_url or os.environ.get("GEMINI_API_BASE", GEMINI_API_BASE)).rstrip("/")
+        self.http = http or get_http_client("gemini")
+
+    def generate_content(self, prompt):
+        from http_client import HttpError
+
+        body = json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode("utf-8")
+        response = self.http.request(
+            "POST",
+            f"{self.base_url}/models/{self.model_name}:generateContent",
+            body,
+            {"Content-Type": "application/json", "x-goog-api-key": self.api_key},
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if not response.ok:
+            message = (data.get("error") or {}).get("message") or response.reason
+            raise HttpError(response.status, message, response.body)
+        candidates = data.get("candidates") or []
+        if not candidates:
+            reason = (data.get("promptFeedback") or {}).get("blockReason", "no candidates")
+            raise ValueError(f"Gemini returned no text ({reason})")
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return GeminiReply("".join(part.get("text", "") for part in parts))
+
+
+def _gemini_client(api_key, model_name):
+    return GeminiClient(api_key, model_name)
+
+
+def _direction(target_language):
+    return "en-ar" if target_language == "ar" else "ar-en"
+
+
+def single_prompt(text, target_language):
+    if target_language == "ar":
+        return f"Translate the following English text to Arabic. Only return the translation, no explanations:\n\n{text}"
+    return f"Translate the following Arabic text to English. Only return the translation, no explanations:\n\n{text}"
+
+
+def batch_prompt(items, target_language):
+    """Prompt asking for a JSON object mapping each segment id to its translation"""
+    source = "English" if target_language == "ar" else "Arabic"
+    target = LANGUAGE_NAMES.get(target_language, target_language)
+    segments = json.dumps({segment_id: text for segment_id, text in items}, ensure_ascii=False, indent=0)
+    return (
+        f"Translate each of the following {source} text segments to {target}. "
+        "The input is a JSON object mapping segment ids to text. "
+        "Reply with only a JSON object that maps every segment id to its translation, "
+        "no explanations:\n\n"
+        f"{segments}"
+    )
+
+
+def parse_batch_response(text):
+    """Extract the id -> translation mapping from a model reply"""
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        mapping = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return {str(k): str(v).strip() for k, v in mapping.items()} if isinstance(mapping, dict) else {}
+
+
+ARABIC_CORRECTION_PROMPT = (
+    "قم بتصحيح الأخطاء الإملائية والنحوية فقط في المقاطع التالية مع الحفاظ على نفس الكلمات والمعنى. "
+    "قد يكون هذا حواراً بين عدة متحدثين. "
+    "قواعد مهمة:\n"
+    "1. حافظ على علامات المتحدثين (الأسطر التي تبدأ بـ '-' أو تحتوي على ':')\n"
+    "2. حافظ على أسماء المتحدثين إن وجدت (قبل علامة :)\n"
+    "3. صحح الأخطاء النحوية والإملائية فقط دون تغيير الكلمات\n"
+    "4. حافظ على نفس المصطلحات والكلمات المستخدمة حتى لو كانت عامية\n"
+    "5. المدخل كائن JSON يربط رقم كل مقطع بنصه. أعد كائن JSON فقط يربط كل رقم بنصه المصحح، "
+    "دون دمج المقاطع أو تقسيمها ودون أي شرح\n\n"
+    "المقاطع المراد تصحيحها:\n"
+)
+
+
+def correction_prompt(items):
+    """Prompt asking for a JSON object mapping each segment id to its corrected Arabic text"""
+    return ARABIC_CORRECTION_PROMPT + json.dumps(dict(items), ensure_ascii=False, indent=0)
+
+
+class ArabicCorrector:
+    """Gemini spelling and grammar correction of Arabic segments.
+
+    Segments are sent in batches of at most batch_size segments and
+    max_chars characters, each keyed by its index so the reply maps back
+    onto the same segments. Up to max_concurrent_requests batches run at
+    once and results come back in order as they finish. Empty segments and
+    markers like "[...]" are not sent, and a segment missing from a reply
+    (or a batch that fails) keeps its original text.
+    """
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL, client_factory=None,
+                 batch_size=40, max_chars=6000, max_concurrent_requests=4):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.max_concurrent_requests = max_concurrent_requests
+        self._client_factory = client_factory or _gemini_client
+        self._client = None
+
+    def correct(self, texts):
+        """Corrected copies of texts, in the same order"""
+        corrected = list(texts)
+        for start, batch in self.correct_batches(texts):
+            corrected[start:start + len(batch)] = batch
+        return corrected
+
+    def correct_batches(self, texts):
+        """Yield (start, corrected texts[start:start + n]) for consecutive batches, in order"""
+        texts = list(texts)
+        if self._client is None:
+            self._client = self._client_factory(self.api_key, self.model_name)
+        ranges = self._batch_ranges(texts)
+        in_flight = deque()
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrent_requests)
+
+        def submit(batch_range):
+            start, end = batch_range
+            in_flight.append((start, pool.submit(self._correct, texts, start, end)))
+
+        try:
+            for batch_range in islice(ranges, self.max_concurrent_requests):
+                submit(batch_range)
+            while in_flight:
+                start, future = in_flight.popleft()
+                batch_range = next(ranges, None)
+                if batch_range:
+                    submit(batch_range)
+                yield start, future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _batch_ranges(self, texts):
+        start, count, chars = 0, 0, 0
+        for i, text in enumerate(texts):
+            if not _correctable(text):
+                continue
+            if count and (count == self.batch_size or chars + len(text) > self.max_chars):
+                yield start, i
+                start, count, chars = i, 0, 0
+            count += 1
+            chars += len(text)
+        if start < len(texts):
+            yield start, len(texts)
+
+    def _correct(self, texts, start, end):
+        batch = texts[start:end]
+        items = [(str(i), text) for i, text in enumerate(batch, start) if _correctable(text)]
+        if not items:
+            return batch
+        try:
+            reply = self._client.generate_content(correction_prompt(items)).text
+            corrected = parse_batch_response(reply)
+        except Exception as e:
+            print(f"Arabic correction error: {e}")
+            return batch
+        return [corrected.get(str(i)) or text if _correctable(text) else text
+                for i, text in enumerate(batch, start)]
+
+
+def _correctable(text):
+    return bool(text) and not text.startswith('[') and bool(text.strip())
+
+
+class Translator:
+    """Gemini translation with a shared client, batching and caching.
+
+    Requests made close together (typically from concurrent transcription
+    workers) are grouped into one Gemini call per direction, with stable
+    segment ids used to split the reply. Translations are cached by
+    (source text, direction) in memory and, when a result cache is given,
+    on disk. Segments missing from a batch reply are retried one by one.
+
+    client_factory(api_key, model_name) must return an object with a
+    generate_content(prompt) method whose result has a .text attribute;
+    it defaults to GeminiClient and can be replaced with a stub.
+    """
+
+    def __init__(self, api_key="", model_name=GEMINI_MODEL, cache=None, client_factory=None,
+                 batch_size=20, max_delay=0.3, max_concurrent_requests=4, memory_cache_size=10000):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.memory_cache_size = memory_cache_size
+        self._client_factory = client_factory or _gemini_client
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._memory = OrderedDict()  # guarded by _cond, like the queue
+        self._pending = {}          # (text, direction) -> Future, shared by duplicate requests
+        self._queue = []            # (text, target_language, future)
+        self._first_queued = None
+        self._cond = threading.Condition()
+        self._dispatcher = None
+        self._requests = ThreadPoolExecutor(max_workers=max_concurrent_requests)
+
+    def set_api_key(self, api_key):
+        with self._client_lock:
+            if api_key != self.api_key:
+                self.api_key = api_key
+                self._client = None
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = self._client_factory(self.api_key, self.model_name)
+            return self._client
+
+    def _cache_key(self, text, direction):
+        return make_key("translation", self.model_name, direction, text)
+
+    def _cached(self, text, direction):
+        with self._cond:
+            translation = self._memory.get((text, direction))
+        if translation is not None:
+            return translation
+        if self.cache:
+            entry = self.cache.get(self._cache_key(text, direction))
+            if entry is not None:
+                self._remember(text, direction, entry["text"], persist=False)
+                return entry["text"]
+        return None
+
+    def _remember(self, text, direction, translation, persist=True):
+        with self._cond:
+            self._memory[(text, direction)] = translation
+            while len(self._memory) > self.memory_cache_size:
+                self._memory.popitem(last=False)
+        if persist and self.cache:
+            self.cache.put(self._cache_key(text, direction), {"text": translation})
+
+    def translate(self, text, target_language="ar"):
+        return self.translate_many([text], target_language)[0]
+
+    def translate_many(self, texts, target_language="ar"):
+        """Translate a list of texts, returning translations in the same order"""
+        if not self.api_key:
+            return ["" for _ in texts]
+        direction = _direction(target_language)
+        results = [None] * len(texts)
+        futures = {}
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = ""
+                continue
+            cached = self._cached(text, direction)
+            if cached is not None:
+                results[i] = cached
+            else:
+                futures[i] = self._enqueue(text, target_language)
+        for i, future in futures.items():
+            results[i] = future.result()
+        return results
+
+    def _enqueue(self, text, target_language):
+        key = (text, _direction(target_language))
+        with self._cond:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pending[key] = Future()
+            if not self._queue:
+                self._first_queued = time.monotonic()
+            self._queue.append((text, target_language, future))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+        return future
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                # Give concurrent callers a moment to join the batch
+                while len(self._queue) < self.batch_size:
+                    remaining = self.max_delay - (time.monotonic() - self._first_queued)
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+                self._first_queued = time.monotonic() if self._queue else None
+
+            by_target = {}
+            for item in batch:
+                by_target.setdefault(item[1], []).append(item)
+            for target_language, items in by_target.items():
+                self._requests.submit(self._send, items, target_language)
+
+    def _send(self, items, target_language):
+        direction = _direction(target_language)
+        try:
+            client = self._get_client()
+            if len(items) == 1:
+                translations = {"1": client.generate_content(single_prompt(items[0][0], target_language)).text.strip()}
+            else:
+                prompt = batch_prompt([(str(i), text) for i, (text, _, _) in enumerate(items, 1)], target_language)
+                translations = parse_batch_response(client.generate_content(prompt).text)
+            for i, (text, _, future) in enumerate(items, 1):
+                translation = translations.get(str(i))
+                if translation is None:
+                    # Not in the batch reply; fall back to a request of its own
+                    translation = client.generate_content(single_prompt(text, target_language)).text.strip()
+                self._remember(text, direction, translation)
+                self._resolve(text, direction, future, translation)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            for text, _, future in items:
+                if not future.done():
+                    self._resolve(text, direction, future, f"[Translation Error: {str(e)}]")
+
+    def _resolve(self, text, direction, future, value):
+        with self._cond:
+            self._pending.pop((text, direction), None)
+        future.set_result(value)
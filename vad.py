@@ -0,0 +1,218 @@
+import numpy as np
+
+from audio_buffer import SAMPLE_RATE
+
+
+def frame_energies_db(samples, frame_len):
+    """RMS level in dBFS of each complete frame"""
+    count = len(samples) // frame_len
+    if not count:
+        return np.zeros(0)
+    frames = samples[:count * frame_len].reshape(count, frame_len).astype(np.float64)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+class SpeechLevel:
+    """Noise floor, speech threshold and amount of speech measured in one region"""
+
+    __slots__ = ("floor_db", "threshold_db", "speech_ms")
+
+    def __init__(self, floor_db, threshold_db, speech_ms):
+        self.floor_db = floor_db
+        self.threshold_db = threshold_db
+        self.speech_ms = speech_ms
+
+    def __repr__(self):
+        return (f"SpeechLevel(floor_db={self.floor_db:.1f}, threshold_db={self.threshold_db:.1f}, "
+                f"speech_ms={self.speech_ms})")
+
+
+class NoiseFloorTracker:
+    """Per-region noise floor and speech threshold across a whole recording.
+
+    Each region (a chunk, before normalization) is measured in one
+    vectorized pass over its frame energies. Its floor is a low percentile
+    of those energies. The tracked floor drops to a quieter region at once
+    and follows a steady region (energies within steady_db, no speech) that
+    is not much louder than it, but otherwise rises only by
+    floor_rise_db_per_sec, so continuous speech is compared against the
+    noise heard before it. Frames more than margin_db above the floor
+    count as speech.
+
+    Wrongly gating speech loses it, while wrongly keeping noise only costs
+    a recognizer call, so the margin is small and a steady first region
+    louder than quiet_db (a sustained voice as much as a hum) is kept.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=30, margin_db=1.5, steady_db=6.0,
+                 quiet_db=-60.0, min_energy_db=-80.0, percentile=10, floor_rise_db_per_sec=0.5):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_len = max(1, int(frame_ms * sample_rate / 1000))
+        self.margin_db = margin_db
+        self.steady_db = steady_db
+        self.quiet_db = quiet_db
+        self.min_energy_db = min_energy_db
+        self.percentile = percentile
+        self.floor_rise = floor_rise_db_per_sec
+        self.floor_db = None
+
+    def measure(self, samples):
+        energies = frame_energies_db(samples, self.frame_len)
+        if not len(energies):
+            return SpeechLevel(self.floor_db or self.min_energy_db, self.min_energy_db, 0)
+        region_floor, region_peak = np.percentile(energies, [self.percentile, 100 - self.percentile])
+        region_floor = float(region_floor)
+        steady = region_peak - region_floor < self.steady_db
+        if self.floor_db is None:
+            if steady and region_floor > self.quiet_db:
+                return SpeechLevel(region_floor, region_floor, len(energies) * self.frame_ms)
+            self.floor_db = region_floor
+        elif region_floor < self.floor_db or (steady and region_floor < self.floor_db + self.steady_db):
+            self.floor_db = region_floor
+        else:
+            rise = self.floor_rise * len(samples) / self.sample_rate
+            self.floor_db = min(region_floor, self.floor_db + rise)
+        threshold = max(self.floor_db + self.margin_db, self.min_energy_db)
+        speech_frames = int(np.count_nonzero(energies > threshold))
+        return SpeechLevel(self.floor_db, threshold, speech_frames * self.frame_ms)
+
+
+class VadSegmenter:
+    """Energy-based voice activity segmenter that works on a stream of blocks.
+
+    Frames louder than the running noise floor plus a margin count as
+    speech. The floor follows quiet frames immediately but rises only
+    slowly, so long stretches of speech are not mistaken for noise.
+
+    Speech frames separated by short pauses form regions; regions shorter
+    than min_speech_ms are dropped as clicks. Consecutive regions are merged
+    into segments of at most max_segment_ms, and silence between segments is
+    never emitted. Continuous speech longer than the maximum is cut at the
+    maximum length.
+
+    Feed blocks with feed() and call flush() at the end of the stream. Both
+    return a list of (start_ms, end_ms, samples) segments. Memory is bounded
+    by roughly one segment plus the pause needed to close a region.
+    """
+
+    def __init__(self, max_segment_ms=15000, sample_rate=SAMPLE_RATE, frame_ms=30,
+                 margin_db=10.0, min_energy_db=-55.0, min_speech_ms=250,
+                 min_silence_ms=500, padding_ms=200, floor_rise_db_per_sec=0.5,
+                 max_floor_db=-30.0):
+        ms = sample_rate / 1000
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(frame_ms * ms))
+        self.max_len = max(self.frame_len, int(max_segment_ms * ms))
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.min_speech = int(min_speech_ms * ms)
+        self.min_silence = int(min_silence_ms * ms)
+        self.padding = int(padding_ms * ms)
+        self.floor_rise = floor_rise_db_per_sec * frame_ms / 1000
+        self.max_floor_db = max_floor_db
+        self._floor = None
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0          # absolute sample index of _buffer[0]
+        self._frame_pos = 0       # absolute sample index of the next frame
+        self._region_start = None
+        self._last_speech_end = 0
+        self._segment = None      # [start, end] absolute sample indices
+        self._emitted_end = 0
+
+    def _ms(self, position):
+        return position * 1000 // self.sample_rate
+
+    def _is_speech(self, energy):
+        if self._floor is None or energy < self._floor:
+            self._floor = min(energy, self.max_floor_db)
+        else:
+            self._floor = min(self._floor + self.floor_rise, energy, self.max_floor_db)
+        return energy > max(self._floor + self.margin_db, self.min_energy_db)
+
+    def feed(self, block):
+        self._buffer = np.concatenate([self._buffer, np.asarray(block, dtype=np.float32)])
+        start = self._frame_pos - self._offset
+        energies = frame_energies_db(self._buffer[start:], self.frame_len)
+
+        segments = []
+        for energy in energies.tolist():
+            self._process_frame(self._is_speech(energy), segments)
+            self._frame_pos += self.frame_len
+
+        # No later region can join a segment that already spans the maximum
+        if self._segment and self._frame_pos - self._segment[0] >= self.max_len:
+            segments.append(self._emit())
+        self._trim()
+        return segments
+
+    def flush(self):
+        segments = []
+        if self._region_start is not None:
+            self._add_region(self._region_start, self._last_speech_end, segments)
+            self._region_start = None
+        if self._segment:
+            segments.append(self._emit())
+        self._buffer = np.zeros(0, dtype=np.float32)
+        return segments
+
+    def _process_frame(self, is_speech, segments):
+        frame_end = self._frame_pos + self.frame_len
+        if is_speech:
+            if self._region_start is None:
+                self._region_start = self._frame_pos
+            self._last_speech_end = frame_end
+            if frame_end - self._region_start >= self.max_len:
+                self._add_region(self._region_start, frame_end, segments)
+                self._region_start = None
+        elif self._region_start is not None and frame_end - self._last_speech_end >= self.min_silence:
+            self._add_region(self._region_start, self._last_speech_end, segments)
+            self._region_start = None
+
+    def _add_region(self, start, end, segments):
+        if end - start < self.min_speech:
+            return
+        start = max(start - self.padding, self._emitted_end, self._offset)
+        end = end + self.padding
+        if self._segment is None:
+            self._segment = [start, end]
+        elif end - self._segment[0] <= self.max_len:
+            self._segment[1] = end
+        else:
+            segments.append(self._emit())
+            self._segment = [max(start, self._emitted_end), end]
+
+    def _emit(self):
+        start, end = self._segment
+        available = self._offset + len(self._buffer)
+        end = min(end, start + self.max_len, available)
+        samples = self._buffer[start - self._offset:end - self._offset].copy()
+        self._segment = None
+        self._emitted_end = end
+        return self._ms(start), self._ms(end), samples
+
+    def _trim(self):
+        keep = self._frame_pos - self.padding
+        if self._region_start is not None:
+            keep = min(keep, self._region_start - self.padding)
+        if self._segment:
+            keep = min(keep, self._segment[0])
+        keep = max(keep, self._offset)
+        if keep > self._offset:
+            self._buffer = self._buffer[keep - self._offset:]
+            self._offset = keep
+
+
+def vad_segments(blocks, max_segment_ms=15000, **options):
+    """Yield (index, start_ms, end_ms, samples) speech segments from a block stream"""
+    segmenter = VadSegmenter(max_segment_ms, **options)
+    index = 0
+    for block in blocks:
+        for start_ms, end_ms, samples in segmenter.feed(block):
+            yield index, start_ms, end_ms, samples
+            index += 1
+    for start_ms, end_ms, samples in segmenter.flush():
+        yield index, start_ms, end_ms, samples
+        index += 1
@@ -0,0 +1,55 @@
+from audio_buffer import SAMPLE_RATE
+
+# Whisper decodes fixed 30 second windows; longer chunks can't be batched
+MAX_BATCH_SECONDS = 30
+
+ARABIC_PROMPT = (
+    "Transcribe in Modern Standard Arabic. If this is a conversation, "
+    "format each speaker's line with a dash (-) at the beginning. "
+    "If there's a clear speaker identification, include it with a colon."
+)
+
+
+def can_batch(samples):
+    """Whether a chunk fits in a single Whisper window"""
+    return len(samples) <= MAX_BATCH_SECONDS * SAMPLE_RATE
+
+
+def decode_batch(model, batch, language="ar", prompt=None,
+                 no_speech_threshold=0.6, logprob_threshold=-1.0):
+    """Decode several chunks in one forward pass.
+
+    Each chunk is padded to a 30 second window, its log-mel spectrogram is
+    computed and the spectrograms are stacked into a single batch for
+    whisper.decode. Returns one text per chunk. Segments Whisper considers
+    silent are returned as empty strings, matching transcribe().
+    """
+    import torch
+    import whisper
+
+    if not batch:
+        return []
+
+    n_mels = model.dims.n_mels
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), n_mels)
+        for samples in batch
+    ]).to(model.device)
+
+    options = whisper.DecodingOptions(
+        language=language,
+        task="transcribe",
+        prompt=prompt,
+        without_timestamps=True,
+        fp16=model.device.type == "cuda",
+    )
+    with torch.no_grad():
+        results = whisper.decode(model, mels, options)
+
+    texts = []
+    for result in results:
+        if result.no_speech_prob > no_speech_threshold and result.avg_logprob < logprob_threshold:
+            texts.append("")
+        else:
+            texts.append(result.text.strip())
+    return texts